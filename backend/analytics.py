@@ -0,0 +1,240 @@
+"""Interview analytics from incrementally maintained rollup documents.
+
+Dashboards used to scan every interview. Instead the write paths bump
+counters in a few small documents in `analytics_rollups`:
+
+- `status`: interviews per status, moved on every transition
+- `job_title:<title>`: scored evaluations and their overall_score sum
+- `flag_type:<type>`: integrity flags pushed, per known flag type plus "other"
+
+Reading them costs the same however long the history is. Counters are bumped
+after the interview write and outside a transaction, so a crash in between
+can leave them slightly off; `python analytics.py backfill` rebuilds them
+from `interviews`.
+"""
+import asyncio
+import logging
+import os
+from collections import Counter
+from numbers import Number
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReplaceOne, UpdateOne
+
+ANALYTICS_JOB_TITLE_LIMIT = int(os.environ.get('ANALYTICS_JOB_TITLE_LIMIT', '100'))
+# Job titles are free text, so keys are bounded
+MAX_KEY_LENGTH = 100
+
+# Flag types come from the client; anything else is counted as "other" so a
+# misbehaving client can't create a rollup document per value
+KNOWN_FLAG_TYPES = {
+    "fullscreen_exit_attempt", "multiple_faces", "no_face", "critical_violation", "unknown"
+}
+FLAG_TYPE_IDS = [f"flag_type:{flag_type}" for flag_type in sorted(KNOWN_FLAG_TYPES | {"other"})]
+
+STATUS_ID = "status"
+
+logger = logging.getLogger("analytics")
+
+
+def scored_overall(evaluation: Optional[Dict[str, Any]]) -> Optional[float]:
+    """overall_score of an evaluation that counts towards averages.
+
+    Terminations carry no score and no-response evaluations a placeholder 0.
+    """
+    if not evaluation:
+        return None
+    score = evaluation.get("overall_score")
+    if not isinstance(score, Number) or isinstance(score, bool):
+        return None
+    if str(evaluation.get("recommendation", "")).startswith("Cannot Evaluate"):
+        return None
+    return float(score)
+
+
+def _key(value: Any) -> str:
+    return str(value or "unknown")[:MAX_KEY_LENGTH]
+
+
+def flag_type_key(value: Any) -> str:
+    flag_type = str(value) if value else "unknown"
+    return flag_type if flag_type in KNOWN_FLAG_TYPES else "other"
+
+
+class AnalyticsRollups:
+    def __init__(self, collection):
+        self.collection = collection
+
+    # Incremental updates; failures are logged, never raised into the write path
+
+    async def status_changed(self, old: Optional[str], new: str, count: int = 1):
+        """Move `count` interviews between statuses; `old` is None for new interviews"""
+        if old == new:
+            return
+        increments = {f"counts.{new}": count}
+        if old is not None:
+            increments[f"counts.{old}"] = -count
+        try:
+            await self.collection.update_one({"_id": STATUS_ID}, {"$inc": increments}, upsert=True)
+        except Exception as e:
+            logger.error(f"Failed to roll up status change {old} -> {new}: {e}")
+
+    async def evaluation_saved(self, job_title: str, evaluation: Dict[str, Any]):
+        score = scored_overall(evaluation)
+        if score is None:
+            return
+        job_title = _key(job_title)
+        try:
+            await self.collection.update_one(
+                {"_id": f"job_title:{job_title}"},
+                {
+                    "$inc": {"evaluations": 1, "overall_score_sum": score},
+                    "$setOnInsert": {"kind": "job_title", "key": job_title}
+                },
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Failed to roll up evaluation for {job_title}: {e}")
+
+    async def flags_pushed(self, interview_id: str, flags: List[Dict[str, Any]]):
+        counts = Counter(flag_type_key(flag.get("flag_type")) for flag in flags)
+        if not counts:
+            return
+        try:
+            await self.collection.bulk_write([
+                UpdateOne(
+                    {"_id": f"flag_type:{flag_type}"},
+                    {"$inc": {"count": count}, "$setOnInsert": {"kind": "flag_type", "key": flag_type}},
+                    upsert=True
+                )
+                for flag_type, count in counts.items()
+            ], ordered=False)
+        except Exception as e:
+            logger.error(f"Failed to roll up {len(flags)} integrity flags for {interview_id}: {e}")
+
+    # Reads
+
+    async def summary(self, job_title_limit: int = ANALYTICS_JOB_TITLE_LIMIT) -> Dict[str, Any]:
+        status_doc = await self.collection.find_one({"_id": STATUS_ID})
+        status_counts = {
+            status: count for status, count in (status_doc or {}).get("counts", {}).items() if count
+        }
+
+        # Most evaluated first, read straight off the kind_evaluations index
+        job_titles = [
+            {
+                "job_title": doc["key"],
+                "evaluations": doc["evaluations"],
+                "average_overall_score": round(doc["overall_score_sum"] / doc["evaluations"], 1)
+            }
+            async for doc in self.collection.find({"kind": "job_title", "evaluations": {"$gt": 0}})
+            .sort([("kind", 1), ("evaluations", -1), ("key", 1)])
+            .limit(job_title_limit)
+        ]
+
+        flag_counts: Dict[str, int] = {}
+        async for doc in self.collection.find({"_id": {"$in": FLAG_TYPE_IDS}}):
+            if doc.get("count"):
+                flag_counts[doc["key"]] = doc["count"]
+
+        ended = status_counts.get("completed", 0) + status_counts.get("terminated", 0)
+        return {
+            "interviews": {
+                "total": sum(status_counts.values()),
+                "by_status": status_counts
+            },
+            # Share of finished interviews that ended in an integrity termination
+            "termination_rate": round(status_counts.get("terminated", 0) / ended, 4) if ended else None,
+            "job_titles": job_titles,
+            "integrity_flags": {
+                "total": sum(flag_counts.values()),
+                "by_flag_type": dict(sorted(flag_counts.items(), key=lambda item: -item[1]))
+            }
+        }
+
+    # Rebuild from history
+
+    async def backfill(self, db) -> Dict[str, int]:
+        """Recompute every rollup from `interviews` and replace the stored ones"""
+        docs: Dict[str, Dict[str, Any]] = {}
+
+        status_counts = {}
+        async for row in db.interviews.aggregate([
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+        ]):
+            status_counts[_key(row["_id"])] = row["count"]
+        docs[STATUS_ID] = {"_id": STATUS_ID, "counts": status_counts}
+
+        async for row in db.interviews.aggregate([
+            {"$match": {"evaluation.overall_score": {"$type": "number"}}},
+            {"$lookup": {
+                "from": "job_descriptions",
+                "localField": "job_description_id",
+                "foreignField": "id",
+                "as": "jd"
+            }},
+            {"$project": {"_id": 0, "evaluation": 1, "jd.title": 1}}
+        ]):
+            score = scored_overall(row["evaluation"])
+            if score is None:
+                continue
+            job_title = _key((row.get("jd") or [{}])[0].get("title"))
+            doc = docs.setdefault(f"job_title:{job_title}", {
+                "_id": f"job_title:{job_title}",
+                "kind": "job_title",
+                "key": job_title,
+                "evaluations": 0,
+                "overall_score_sum": 0.0
+            })
+            doc["evaluations"] += 1
+            doc["overall_score_sum"] += score
+
+        async for row in db.interviews.aggregate([
+            {"$unwind": "$integrity_flags"},
+            {"$group": {"_id": "$integrity_flags.flag_type", "count": {"$sum": 1}}}
+        ]):
+            flag_type = flag_type_key(row["_id"])
+            doc = docs.setdefault(f"flag_type:{flag_type}", {
+                "_id": f"flag_type:{flag_type}",
+                "kind": "flag_type",
+                "key": flag_type,
+                "count": 0
+            })
+            # Unknown types are merged into "other"
+            doc["count"] += row["count"]
+
+        await self.collection.bulk_write(
+            [ReplaceOne({"_id": doc_id}, doc, upsert=True) for doc_id, doc in docs.items()],
+            ordered=False
+        )
+        await self.collection.delete_many({"_id": {"$nin": list(docs)}})
+        return {
+            "interviews": sum(status_counts.values()),
+            "job_titles": sum(1 for doc in docs.values() if doc.get("kind") == "job_title"),
+            "flag_types": sum(1 for doc in docs.values() if doc.get("kind") == "flag_type")
+        }
+
+
+async def _backfill():
+    from pathlib import Path
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ.get('MONGO_URL', 'mongodb://localhost:27017'))
+    db = client[os.environ.get('DB_NAME', 'test_database')]
+    try:
+        report = await AnalyticsRollups(db.analytics_rollups).backfill(db)
+        logger.info(f"Analytics rollups rebuilt: {report}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    # Usage: python analytics.py backfill
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if sys.argv[1:] != ["backfill"]:
+        sys.exit("usage: python analytics.py backfill")
+    asyncio.run(_backfill())
@@ -0,0 +1,142 @@
+"""Pub/sub backplane for delivering WebSocket messages across workers.
+
+Each worker only holds the sockets that connected to it. When a worker needs
+to reach an interview whose socket lives elsewhere, it publishes the message
+on the backplane and the owning worker delivers it locally.
+
+`memory` keeps everything in-process (a single worker). `mongo` shares a
+capped collection that every worker tails, so it works against a standalone
+mongod without a replica set.
+"""
+import abc
+import asyncio
+import logging
+import os
+import uuid
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid
+
+WS_BACKPLANE = os.environ.get('WS_BACKPLANE', 'memory').lower()
+WS_BACKPLANE_COLLECTION = os.environ.get('WS_BACKPLANE_COLLECTION', 'ws_backplane')
+WS_BACKPLANE_SIZE_BYTES = int(os.environ.get('WS_BACKPLANE_SIZE_BYTES', str(16 * 1024 * 1024)))
+WS_BACKPLANE_POLL_SECONDS = float(os.environ.get('WS_BACKPLANE_POLL_SECONDS', '0.1'))
+
+Handler = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+logger = logging.getLogger("backplane")
+
+
+class Backplane(abc.ABC):
+    """Deliver `(interview_id, message)` to whichever worker owns the socket"""
+
+    def __init__(self):
+        self.worker_id = str(uuid.uuid4())
+        self._handler: Optional[Handler] = None
+
+    async def start(self, handler: Handler):
+        self._handler = handler
+
+    @abc.abstractmethod
+    async def publish(self, interview_id: str, message: Dict[str, Any]):
+        """Send `message` towards the worker holding `interview_id`'s socket"""
+
+    async def close(self):
+        pass
+
+    async def _dispatch(self, interview_id: str, message: Dict[str, Any]):
+        if self._handler is None:
+            return
+        try:
+            await self._handler(interview_id, message)
+        except Exception as e:
+            logger.error(f"Backplane delivery to {interview_id} failed: {e}")
+
+
+class InMemoryBackplane(Backplane):
+    """Single-process backplane; messages go straight to the local handler"""
+
+    async def publish(self, interview_id: str, message: Dict[str, Any]):
+        await self._dispatch(interview_id, message)
+
+
+class MongoBackplane(Backplane):
+    """Workers insert into a capped collection and tail it for their sockets"""
+
+    # Inserts from different workers can land slightly out of timestamp order,
+    # so a re-opened cursor looks back this far and skips ids it already saw
+    REOPEN_SLACK = timedelta(seconds=5)
+    SEEN_IDS = 4096
+
+    def __init__(self, db, collection: str = WS_BACKPLANE_COLLECTION,
+                 size_bytes: int = WS_BACKPLANE_SIZE_BYTES,
+                 poll_interval: float = WS_BACKPLANE_POLL_SECONDS):
+        super().__init__()
+        self.db = db
+        self.collection_name = collection
+        self.collection = db[collection]
+        self.size_bytes = size_bytes
+        self.poll_interval = poll_interval
+        self._seen = deque(maxlen=self.SEEN_IDS)
+        self._seen_set = set()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, handler: Handler):
+        await super().start(handler)
+        try:
+            await self.db.create_collection(self.collection_name, capped=True, size=self.size_bytes)
+        except CollectionInvalid:
+            pass
+        except Exception as e:
+            logger.error(f"Could not create capped collection {self.collection_name}: {e}")
+        self._task = asyncio.create_task(self._tail(datetime.now(timezone.utc)))
+
+    async def publish(self, interview_id: str, message: Dict[str, Any]):
+        await self.collection.insert_one({
+            "interview_id": interview_id,
+            "message": message,
+            "origin": self.worker_id,
+            "published_at": datetime.now(timezone.utc)
+        })
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _tail(self, since: datetime):
+        while True:
+            try:
+                cursor = self.collection.find(
+                    {"published_at": {"$gte": since - self.REOPEN_SLACK}},
+                    cursor_type=CursorType.TAILABLE_AWAIT
+                )
+                async for doc in cursor:
+                    since = max(since, doc["published_at"].replace(tzinfo=timezone.utc))
+                    if not self._mark_seen(doc["_id"]) or doc.get("origin") == self.worker_id:
+                        continue
+                    await self._dispatch(doc["interview_id"], doc["message"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Backplane tail failed: {e}")
+            # Tailable cursors die on an empty collection; re-open shortly
+            await asyncio.sleep(self.poll_interval)
+
+    def _mark_seen(self, doc_id) -> bool:
+        if doc_id in self._seen_set:
+            return False
+        if len(self._seen) == self._seen.maxlen:
+            self._seen_set.discard(self._seen[0])
+        self._seen.append(doc_id)
+        self._seen_set.add(doc_id)
+        return True
+
+
+def create_backplane(db) -> Backplane:
+    if WS_BACKPLANE == "mongo":
+        return MongoBackplane(db)
+    return InMemoryBackplane()
@@ -0,0 +1,95 @@
+"""Two-tier caches: an in-process LRU in front of a Mongo collection."""
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """Small in-memory LRU with an optional per-entry TTL"""
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """`ttl` overrides the cache default, e.g. an entry's remaining lifetime"""
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TieredCache:
+    """LRU cache backed by a Mongo collection keyed on `_id`.
+
+    Values must be BSON serialisable. With a TTL, entries carry an
+    `expires_at` date so a Mongo TTL index (see indexes.py) can evict them.
+    """
+
+    def __init__(self, collection, maxsize: int = 256, ttl: Optional[float] = None):
+        self.collection = collection
+        self.ttl = ttl
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Any:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        doc = await self.collection.find_one({"_id": key})
+        if not doc:
+            return None
+        expires_at = doc.get("expires_at")
+        remaining = None
+        if expires_at is not None:
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+            if remaining <= 0:
+                return None
+        # Kept in memory only as long as the stored entry still lives
+        self.memory.set(key, doc["value"], ttl=remaining)
+        return doc["value"]
+
+    async def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        now = datetime.now(timezone.utc)
+        doc = {"value": value, "created_at": now}
+        if self.ttl:
+            doc["expires_at"] = now + timedelta(seconds=self.ttl)
+        await self.collection.update_one({"_id": key}, {"$set": doc}, upsert=True)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one in-flight task"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # A caller going away must not cancel the call other callers share
+        return await asyncio.shield(task)
@@ -0,0 +1,130 @@
+"""Resume / job description text extraction.
+
+PDF and DOCX parsing is CPU bound, so uploads are parsed in a bounded
+process pool instead of on the event loop that serves live interviews.
+"""
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional
+
+import PyPDF2
+import docx
+
+PARSE_WORKERS = int(os.environ.get('PARSE_WORKERS', os.cpu_count() or 1))
+PARSE_MAX_PENDING = int(os.environ.get('PARSE_MAX_PENDING', PARSE_WORKERS * 4))
+PARSE_TIMEOUT_SECONDS = float(os.environ.get('PARSE_TIMEOUT_SECONDS', '30'))
+
+
+class ParserSaturated(Exception):
+    """Raised when too many parse jobs are already queued"""
+
+
+class ParseTimeout(Exception):
+    """Raised when a single parse job exceeds its deadline"""
+
+
+def extract_text_from_pdf(file_content: bytes) -> str:
+    try:
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+        text = ""
+        for page in pdf_reader.pages:
+            text += page.extract_text()
+        return text
+    except Exception as e:
+        logging.error(f"Error extracting PDF: {e}")
+        return ""
+
+
+def extract_text_from_docx(file_content: bytes) -> str:
+    try:
+        doc = docx.Document(io.BytesIO(file_content))
+        text = "\n".join([para.text for para in doc.paragraphs])
+        return text
+    except Exception as e:
+        logging.error(f"Error extracting DOCX: {e}")
+        return ""
+
+
+EXTRACTORS: Dict[str, Callable[[bytes], str]] = {
+    '.pdf': extract_text_from_pdf,
+    '.docx': extract_text_from_docx,
+}
+
+
+def get_extractor(filename: str) -> Optional[Callable[[bytes], str]]:
+    for suffix, extractor in EXTRACTORS.items():
+        if filename.endswith(suffix):
+            return extractor
+    return None
+
+
+class DocumentParserPool:
+    """Process pool with a queue-depth limit and per-job timeouts.
+
+    Jobs queue here, not inside the executor, so at most `max_workers` are
+    submitted at once and a job's deadline only covers its own run.
+    """
+
+    def __init__(self, max_workers: int = PARSE_WORKERS, max_pending: int = PARSE_MAX_PENDING,
+                 timeout: float = PARSE_TIMEOUT_SECONDS):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pending = 0
+        self._slots = asyncio.Semaphore(max_workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn keeps the Mongo client threads of the server out of the workers
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _recycle(self, executor: ProcessPoolExecutor):
+        """Drop a pool, killing workers stuck on a pathological file"""
+        if self._executor is executor:
+            self._executor = None
+        for process in list(getattr(executor, "_processes", {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def extract(self, extractor: Callable[[bytes], str], content: bytes) -> str:
+        if self.pending >= self.max_pending:
+            raise ParserSaturated(f"{self.pending} parse jobs already pending")
+
+        self.pending += 1
+        try:
+            async with self._slots:
+                executor = self._get_executor()
+                future = asyncio.get_running_loop().run_in_executor(executor, extractor, content)
+                try:
+                    return await asyncio.wait_for(future, self.timeout)
+                except asyncio.TimeoutError:
+                    logging.error(f"Document parse exceeded {self.timeout}s, recycling parser pool")
+                    self._recycle(executor)
+                    raise ParseTimeout(f"Parsing took longer than {self.timeout}s")
+                except BrokenProcessPool:
+                    # A sibling job on this pool timed out and the pool was recycled
+                    # underneath us, or a worker died; either way this pool is
+                    # done, but nothing else is killed
+                    if self._executor is executor:
+                        self._executor = None
+                    raise ParserSaturated("Parser pool restarted")
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+parser_pool = DocumentParserPool()
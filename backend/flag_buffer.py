@@ -0,0 +1,120 @@
+"""Write-behind buffer for proctoring integrity flags.
+
+Flags arrive in bursts (fullscreen exits, tab switches), so instead of one
+`$push` per flag they are collected per interview and written as a single
+`$push: {$each: [...]}` once the batch is full or the flush interval passes.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+FLAG_BATCH_SIZE = int(os.environ.get('FLAG_BATCH_SIZE', '20'))
+FLAG_FLUSH_INTERVAL_SECONDS = float(os.environ.get('FLAG_FLUSH_INTERVAL_SECONDS', '2'))
+FLAG_DEDUPE_WINDOW_SECONDS = float(os.environ.get('FLAG_DEDUPE_WINDOW_SECONDS', '5'))
+
+# Called with each batch once it is written
+FlushHandler = Callable[[str, List[Dict[str, Any]]], Awaitable[None]]
+
+
+class _InterviewFlags:
+    def __init__(self):
+        self.pending: List[Dict[str, Any]] = []
+        self.last_seen: Dict[Tuple[str, str], float] = {}
+        self.lock = asyncio.Lock()
+        self.timer: Optional[asyncio.Task] = None
+
+
+class IntegrityFlagBuffer:
+    def __init__(self, collection, batch_size: int = FLAG_BATCH_SIZE,
+                 flush_interval: float = FLAG_FLUSH_INTERVAL_SECONDS,
+                 dedupe_window: float = FLAG_DEDUPE_WINDOW_SECONDS,
+                 on_flush: Optional[FlushHandler] = None):
+        self.collection = collection
+        self.on_flush = on_flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dedupe_window = dedupe_window
+        self._interviews: Dict[str, _InterviewFlags] = {}
+
+    async def add(self, interview_id: str, flag: Dict[str, Any]) -> bool:
+        """Queue a flag; returns False when it duplicates one inside the window"""
+        state = self._interviews.setdefault(interview_id, _InterviewFlags())
+        key = (flag.get('flag_type', ''), flag.get('description', ''))
+        now = time.monotonic()
+        last_seen = state.last_seen.get(key)
+        if last_seen is not None and now - last_seen < self.dedupe_window:
+            return False
+        state.last_seen[key] = now
+        state.pending.append(flag)
+
+        if len(state.pending) >= self.batch_size:
+            await self.flush(interview_id)
+        if state.timer is None:
+            state.timer = asyncio.create_task(self._flush_later(interview_id, state))
+        return True
+
+    async def _flush_later(self, interview_id: str, state: _InterviewFlags):
+        """Flush every interval until the interview goes idle, then forget it.
+
+        Failed writes stay pending and are retried on the next round. State is
+        kept while a flag is still inside the dedupe window.
+        """
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush(interview_id)
+                if state.pending:
+                    continue
+                newest = max(state.last_seen.values(), default=0.0)
+                if time.monotonic() - newest >= self.dedupe_window:
+                    break
+        finally:
+            if state.timer is asyncio.current_task():
+                state.timer = None
+        if self._interviews.get(interview_id) is state and not state.pending:
+            del self._interviews[interview_id]
+
+    async def flush(self, interview_id: str):
+        state = self._interviews.get(interview_id)
+        if state is None:
+            return
+        async with state.lock:
+            if not state.pending:
+                return
+            batch, state.pending = state.pending, []
+            try:
+                await self.collection.update_one(
+                    {"id": interview_id},
+                    {"$push": {"integrity_flags": {"$each": batch}}}
+                )
+            except Exception as e:
+                logging.error(f"Failed to flush {len(batch)} integrity flags for {interview_id}: {e}")
+                # Keep them for the next flush, ahead of anything queued since
+                state.pending = batch + state.pending
+                return
+            if self.on_flush is not None:
+                await self.on_flush(interview_id, batch)
+
+    async def close(self, interview_id: str):
+        """Flush and forget an interview, e.g. when its socket disconnects"""
+        state = self._interviews.get(interview_id)
+        if state is None:
+            return
+        async with state.lock:
+            # Under the lock the timer is sleeping or waiting for it, never
+            # mid-write, so cancelling it can't drop a batch
+            if state.timer is not None:
+                state.timer.cancel()
+                state.timer = None
+        await self.flush(interview_id)
+        if not state.pending:
+            self._interviews.pop(interview_id, None)
+        elif state.timer is None:
+            # The write failed; keep retrying instead of dropping the flags
+            state.timer = asyncio.create_task(self._flush_later(interview_id, state))
+
+    async def flush_all(self):
+        for interview_id in list(self._interviews):
+            await self.close(interview_id)
@@ -0,0 +1,108 @@
+"""Declared MongoDB indexes, reconciled against the database at startup."""
+import logging
+from typing import Any, Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "interviews": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # Keyset pagination of /interviews, optionally filtered by status
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id_desc"),
+        IndexModel(
+            [("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="status_created_at_id_desc"
+        ),
+    ],
+    "job_descriptions": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "candidate_resumes": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "resume_index": [
+        IndexModel([("resume_id", ASCENDING)], name="resume_id_unique", unique=True),
+        # Workers catch up on each other's entries by indexed_at
+        IndexModel([("indexed_at", ASCENDING)], name="indexed_at"),
+    ],
+    "jobs": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # One job per piece of work, e.g. one evaluation per interview
+        IndexModel([("kind", ASCENDING), ("key", ASCENDING)], name="kind_key_unique", unique=True),
+        # Workers claim due jobs and jobs whose lease lapsed
+        IndexModel([("status", ASCENDING), ("run_after", ASCENDING)], name="status_run_after"),
+        IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)], name="status_lease_expires_at"),
+    ],
+    "analytics_rollups": [
+        # Top job titles by evaluation count for /analytics
+        IndexModel(
+            [("kind", ASCENDING), ("evaluations", DESCENDING), ("key", ASCENDING)],
+            name="kind_evaluations"
+        ),
+    ],
+    "role_fit_cache": [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+# Options that change index behaviour; a mismatch means the index is rebuilt
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+def _matches(existing: Dict[str, Any], declared: Dict[str, Any]) -> bool:
+    if list(existing["key"]) != list(declared["key"].items()):
+        return False
+    return all(existing.get(option) == declared.get(option) for option in _COMPARED_OPTIONS)
+
+
+async def reconcile_indexes(db) -> Dict[str, Dict[str, List[str]]]:
+    """Create missing indexes and rebuild ones whose definition changed.
+
+    Indexes that are not declared here are reported but never dropped.
+    """
+    report = {}
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+        result = {"created": [], "rebuilt": [], "failed": [], "unmanaged": []}
+
+        for model in models:
+            declared = model.document
+            name = declared["name"]
+            current = existing.get(name)
+            if current is not None and _matches(current, declared):
+                continue
+            try:
+                if current is not None:
+                    await collection.drop_index(name)
+                await collection.create_indexes([model])
+                result["rebuilt" if current is not None else "created"].append(name)
+            except OperationFailure as e:
+                # e.g. duplicate ids in old data block a unique index
+                logging.error(f"Failed to create index {collection_name}.{name}: {e}")
+                result["failed"].append(name)
+
+        declared_names = {model.document["name"] for model in models}
+        result["unmanaged"] = [name for name in existing if name != "_id_" and name not in declared_names]
+        if result["unmanaged"]:
+            logging.warning(f"Unmanaged indexes on {collection_name}: {result['unmanaged']}")
+        report[collection_name] = result
+    return report
+
+
+async def index_usage(db) -> Dict[str, List[Dict[str, Any]]]:
+    """Per-index access counters from $indexStats for every managed collection"""
+    usage = {}
+    for collection_name in INDEXES:
+        stats = await db[collection_name].aggregate([{"$indexStats": {}}]).to_list(None)
+        usage[collection_name] = [
+            {
+                "name": stat["name"],
+                "key": stat["key"],
+                "ops": stat["accesses"]["ops"],
+                "since": stat["accesses"]["since"],
+            }
+            for stat in stats
+        ]
+    return usage
@@ -0,0 +1,350 @@
+"""Durable background jobs backed by a Mongo collection.
+
+A job is a document in `jobs`, unique per `(kind, key)` so re-submitting the
+same work returns the existing job. Workers claim a job by atomically setting
+a lease on it; while the handler runs the lease is renewed, and if the worker
+dies the lease lapses and another worker picks the job up. A failing handler
+is retried with exponential backoff until `max_attempts`, after which the job
+is marked failed with its last error. A handler whose inputs aren't ready
+yet raises `RetryLater` to be re-queued without spending an attempt.
+
+Handlers must be idempotent: a job whose lease lapsed mid-run can run again.
+"""
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from metrics import BACKGROUND_JOBS, BACKGROUND_JOB_WAIT_SECONDS
+
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+JOB_LEASE_SECONDS = float(os.environ.get('JOB_LEASE_SECONDS', '60'))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '3'))
+JOB_POLL_SECONDS = float(os.environ.get('JOB_POLL_SECONDS', '1'))
+JOB_RETRY_BACKOFF_SECONDS = float(os.environ.get('JOB_RETRY_BACKOFF_SECONDS', '5'))
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+# Called with the payload once a job has failed for good
+FailureHandler = Callable[[Dict[str, Any], str], Awaitable[None]]
+
+logger = logging.getLogger("job_queue")
+
+
+class RetryLater(Exception):
+    """Raised by a handler to run the job again after `delay` seconds"""
+
+    def __init__(self, delay: float, reason: str = ""):
+        super().__init__(reason)
+        self.delay = delay
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(value: datetime) -> datetime:
+    """Mongo returns naive UTC datetimes"""
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _job(doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    # Read back whole rather than projected: the documents are small, and
+    # mongomock drops projected AFTER results when the update moves a filter field
+    if doc is not None:
+        doc.pop("_id", None)
+    return doc
+
+
+class JobQueue:
+    def __init__(self, collection, workers: int = JOB_WORKERS,
+                 lease_seconds: float = JOB_LEASE_SECONDS,
+                 max_attempts: int = JOB_MAX_ATTEMPTS,
+                 poll_interval: float = JOB_POLL_SECONDS,
+                 retry_backoff: float = JOB_RETRY_BACKOFF_SECONDS):
+        self.collection = collection
+        self.workers = workers
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.retry_backoff = retry_backoff
+        self.worker_id = str(uuid.uuid4())
+        self._handlers: Dict[str, Handler] = {}
+        self._failure_handlers: Dict[str, FailureHandler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._settled = asyncio.Condition()
+
+    def register(self, kind: str, handler: Handler, on_failed: Optional[FailureHandler] = None):
+        """Queues claim only registered kinds, so each kind can get its own worker pool"""
+        self._handlers[kind] = handler
+        if on_failed is not None:
+            self._failure_handlers[kind] = on_failed
+
+    # Submitting and reading
+
+    async def enqueue(self, kind: str, key: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a job, or return the existing one for `(kind, key)`.
+
+        A job that already failed for good is queued again from scratch.
+        """
+        now = _now()
+        try:
+            job = await self._upsert(kind, key, payload, now)
+        except DuplicateKeyError:
+            # A concurrent enqueue inserted it first
+            job = await self._upsert(kind, key, payload, now)
+        if job["status"] == "failed":
+            job = _job(await self.collection.find_one_and_update(
+                {"id": job["id"], "status": "failed"},
+                {"$set": {
+                    "status": "queued",
+                    "attempts": 0,
+                    "run_after": now,
+                    "payload": payload,
+                    "last_error": None
+                }},
+                return_document=ReturnDocument.AFTER
+            )) or job
+        if job["status"] == "queued":
+            self._wakeup.set()
+        return job
+
+    async def enqueue_many(self, kind: str, jobs: List[Tuple[str, Dict[str, Any]]]):
+        """Queue `(key, payload)` jobs in one round trip; existing keys are left as they are"""
+        if not jobs:
+            return
+        now = _now()
+        await self.collection.bulk_write([
+            UpdateOne({"kind": kind, "key": key}, {"$setOnInsert": self._new_job(kind, key, payload, now)},
+                      upsert=True)
+            for key, payload in jobs
+        ], ordered=False)
+        self._wakeup.set()
+
+    @staticmethod
+    def _new_job(kind: str, key: str, payload: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        return {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "key": key,
+            "payload": payload,
+            "status": "queued",
+            "attempts": 0,
+            "run_after": now,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "last_error": None,
+            "created_at": now
+        }
+
+    async def _upsert(self, kind: str, key: str, payload: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        return _job(await self.collection.find_one_and_update(
+            {"kind": kind, "key": key},
+            {"$setOnInsert": self._new_job(kind, key, payload, now)},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        ))
+
+    async def get(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"kind": kind, "key": key}, {"_id": 0})
+
+    async def wait_settled(self, timeout: float) -> bool:
+        """Wait until a job on this worker finishes or fails for good.
+
+        Jobs finishing on other workers aren't seen here, so callers still
+        re-read their state after the timeout.
+        """
+        async with self._settled:
+            try:
+                await asyncio.wait_for(self._settled.wait(), timeout)
+                return True
+            except asyncio.TimeoutError:
+                return False
+
+    # Workers
+
+    def start(self):
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def close(self):
+        """Stop the workers and hand their in-flight jobs back to the queue"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self):
+        while True:
+            try:
+                job = await self._claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to claim a job: {e}")
+                job = None
+            if job is None:
+                await self._idle()
+                continue
+            await self._run(job)
+
+    async def _idle(self):
+        """Sleep until a job is enqueued here or the poll interval passes"""
+        # Not wait_for: on 3.11 it can swallow a cancel that lands as it
+        # times out, which would leave close() waiting on this worker forever
+        waiter = asyncio.ensure_future(self._wakeup.wait())
+        try:
+            await asyncio.wait({waiter}, timeout=self.poll_interval)
+        finally:
+            waiter.cancel()
+        self._wakeup.clear()
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        now = _now()
+        job = _job(await self.collection.find_one_and_update(
+            {
+                "kind": {"$in": list(self._handlers)},
+                "$or": [
+                    {"status": "queued", "run_after": {"$lte": now}},
+                    # The worker holding it died or stalled
+                    {"status": "running", "lease_expires_at": {"$lte": now}}
+                ]
+            },
+            {
+                "$set": {
+                    "status": "running",
+                    "lease_owner": self.worker_id,
+                    "lease_expires_at": now + self.lease,
+                    "started_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("run_after", 1)],
+            return_document=ReturnDocument.AFTER
+        ))
+        if job is None:
+            return None
+        BACKGROUND_JOB_WAIT_SECONDS.labels(job["kind"]).observe(
+            max(0.0, (now - _aware(job["run_after"])).total_seconds())
+        )
+        if job["attempts"] > self.max_attempts:
+            # Every attempt lost its lease, e.g. the job keeps killing its worker
+            await self._finish(job, "failed", last_error="lease expired on every attempt")
+            return None
+        return job
+
+    async def _run(self, job: Dict[str, Any]):
+        handler = self._handlers[job["kind"]]
+        task = asyncio.create_task(handler(job["payload"]))
+        renewer = asyncio.create_task(self._renew_lease(job, task))
+        try:
+            await task
+        except asyncio.CancelledError:
+            if renewer.done() and not renewer.cancelled() and renewer.result():
+                # Another worker owns it now
+                BACKGROUND_JOBS.labels(job["kind"], "lease_lost").inc()
+                logger.warning(f"Lost the lease on {job['kind']} job {job['id']}")
+                return
+            # Shutting down; let another worker have it without spending an attempt
+            await asyncio.shield(self._release(job))
+            raise
+        except RetryLater as e:
+            await self._defer(job, e)
+        except Exception as e:
+            await self._fail(job, e)
+        else:
+            await self._finish(job, "done")
+        finally:
+            renewer.cancel()
+
+    async def _renew_lease(self, job: Dict[str, Any], task: asyncio.Task) -> bool:
+        """Keep extending the lease; True once it was lost and the handler cancelled"""
+        while True:
+            await asyncio.sleep(self.lease.total_seconds() / 3)
+            try:
+                result = await self.collection.update_one(
+                    {"id": job["id"], "lease_owner": self.worker_id, "status": "running"},
+                    {"$set": {"lease_expires_at": _now() + self.lease}}
+                )
+            except Exception as e:
+                # The lease may still be valid; try again next round
+                logger.error(f"Failed to renew the lease on {job['kind']} job {job['id']}: {e}")
+                continue
+            if result.matched_count == 0:
+                task.cancel()
+                return True
+
+    async def _fail(self, job: Dict[str, Any], error: Exception):
+        if job["attempts"] >= self.max_attempts:
+            logger.error(f"{job['kind']} job {job['id']} failed after {job['attempts']} attempts: {error}")
+            await self._finish(job, "failed", last_error=str(error)[:1000])
+            return
+        delay = self.retry_backoff * 2 ** (job["attempts"] - 1)
+        logger.warning(f"{job['kind']} job {job['id']} attempt {job['attempts']} failed, retrying in {delay:.0f}s: {error}")
+        BACKGROUND_JOBS.labels(job["kind"], "retried").inc()
+        await self.collection.update_one(
+            {"id": job["id"], "lease_owner": self.worker_id},
+            {"$set": {
+                "status": "queued",
+                "run_after": _now() + timedelta(seconds=delay),
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "last_error": str(error)[:1000]
+            }}
+        )
+
+    async def _defer(self, job: Dict[str, Any], retry: RetryLater):
+        BACKGROUND_JOBS.labels(job["kind"], "deferred").inc()
+        await self.collection.update_one(
+            {"id": job["id"], "lease_owner": self.worker_id},
+            {
+                "$set": {
+                    "status": "queued",
+                    "run_after": _now() + timedelta(seconds=retry.delay),
+                    "lease_owner": None,
+                    "lease_expires_at": None
+                },
+                "$inc": {"attempts": -1}
+            }
+        )
+
+    async def _finish(self, job: Dict[str, Any], status: str, last_error: Optional[str] = None):
+        BACKGROUND_JOBS.labels(job["kind"], status).inc()
+        update = {
+            "status": status,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "finished_at": _now()
+        }
+        if last_error is not None:
+            update["last_error"] = last_error
+        result = await self.collection.update_one(
+            {"id": job["id"], "lease_owner": self.worker_id},
+            {"$set": update}
+        )
+        on_failed = self._failure_handlers.get(job["kind"])
+        if status == "failed" and on_failed is not None and result.modified_count:
+            try:
+                await on_failed(job["payload"], last_error or "")
+            except Exception as e:
+                logger.error(f"Failure handler for {job['kind']} job {job['id']} failed: {e}")
+        async with self._settled:
+            self._settled.notify_all()
+
+    async def _release(self, job: Dict[str, Any]):
+        try:
+            await self.collection.update_one(
+                {"id": job["id"], "lease_owner": self.worker_id},
+                {
+                    "$set": {"status": "queued", "lease_owner": None, "lease_expires_at": None},
+                    "$inc": {"attempts": -1}
+                }
+            )
+        except Exception as e:
+            logger.error(f"Failed to release {job['kind']} job {job['id']}: {e}")
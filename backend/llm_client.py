@@ -0,0 +1,307 @@
+"""Process-wide LLM client.
+
+Every LLM call in the backend goes through `llm`, which adds priority
+scheduling and rate limiting (see llm_scheduler.py), per-call deadlines,
+retries with jittered exponential backoff and a circuit breaker on top of
+`LlmChat`.
+"""
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from emergentintegrations.llm.chat import LlmChat, UserMessage
+
+from llm_scheduler import LLMScheduler, PRIORITY_LIVE_TURN
+from metrics import LLM_CALL_SECONDS, LLM_FIRST_TOKEN_SECONDS
+
+# "emergent" talks to the real provider through LlmChat, which can't stream;
+# "litellm" calls the provider directly and streams tokens; "mock" uses the
+# offline stand-in in mock_llm.py
+LLM_BACKEND = os.environ.get('LLM_BACKEND', 'emergent')
+# Provider endpoint for the litellm backend; empty uses litellm's default
+LLM_API_BASE = os.environ.get('LLM_API_BASE', '')
+LLM_PROVIDER = os.environ.get('LLM_PROVIDER', 'openai')
+LLM_MODEL = os.environ.get('LLM_MODEL', 'gpt-5.2')
+LLM_TIMEOUT_SECONDS = float(os.environ.get('LLM_TIMEOUT_SECONDS', '60'))
+LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', '2'))
+LLM_BACKOFF_BASE_SECONDS = float(os.environ.get('LLM_BACKOFF_BASE_SECONDS', '0.5'))
+LLM_BACKOFF_MAX_SECONDS = float(os.environ.get('LLM_BACKOFF_MAX_SECONDS', '8'))
+LLM_BREAKER_THRESHOLD = int(os.environ.get('LLM_BREAKER_THRESHOLD', '5'))
+LLM_BREAKER_RESET_SECONDS = float(os.environ.get('LLM_BREAKER_RESET_SECONDS', '30'))
+LLM_MAX_CONNECTIONS = int(os.environ.get('LLM_MAX_CONNECTIONS', '100'))
+LLM_EXPECTED_OUTPUT_TOKENS = int(os.environ.get('LLM_EXPECTED_OUTPUT_TOKENS', '400'))
+
+T = TypeVar("T")
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough token count for rate limiting: ~4 characters per token plus the reply"""
+    return sum(len(text) for text in texts) // 4 + LLM_EXPECTED_OUTPUT_TOKENS
+
+
+class LLMUnavailable(Exception):
+    """Raised without calling the provider while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures, half-opens after `reset_after`"""
+
+    def __init__(self, threshold: int = LLM_BREAKER_THRESHOLD, reset_after: float = LLM_BREAKER_RESET_SECONDS):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        state = self.state
+        if state == "open" or (state == "half_open" and self._trial_in_flight):
+            raise LLMUnavailable("LLM circuit breaker is open")
+        if state == "half_open":
+            self._trial_in_flight = True
+
+    def abandon_trial(self):
+        """A cancelled call proves nothing either way"""
+        self._trial_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.failures >= self.threshold or self.opened_at is not None:
+            if self.opened_at is None:
+                logging.error(f"LLM circuit breaker opened after {self.failures} failures")
+            self.opened_at = time.monotonic()
+
+
+def _configure_connection_pool():
+    """Share one keep-alive HTTP pool across every chat.
+
+    LlmChat talks to the provider through litellm, which uses
+    `litellm.aclient_session` for async OpenAI-compatible calls when set.
+    """
+    try:
+        import httpx
+        import litellm
+    except ImportError:
+        return
+    if getattr(litellm, "aclient_session", None) is None:
+        litellm.aclient_session = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_CONNECTIONS
+            ),
+            timeout=LLM_TIMEOUT_SECONDS
+        )
+
+
+class LiteLLMChat:
+    """LlmChat's send_message over litellm directly, plus token streaming.
+
+    Keeps the conversation itself, so streamed and whole replies share one
+    history.
+    """
+
+    def __init__(self, api_key: str, provider: str, model: str, system_message: str,
+                 initial_messages: Optional[List[Dict[str, str]]] = None):
+        self.params = {"model": f"{provider}/{model}", "api_key": api_key}
+        if LLM_API_BASE:
+            self.params["api_base"] = LLM_API_BASE
+        self.messages = [{"role": "system", "content": system_message}] + list(initial_messages or [])
+
+    async def send_message(self, message: UserMessage) -> str:
+        import litellm
+        prompt = {"role": "user", "content": message.text}
+        response = await litellm.acompletion(messages=self.messages + [prompt], **self.params)
+        reply = response.choices[0].message.content or ""
+        self.messages += [prompt, {"role": "assistant", "content": reply}]
+        return reply
+
+    async def stream_message(self, message: UserMessage) -> AsyncIterator[str]:
+        import litellm
+        prompt = {"role": "user", "content": message.text}
+        response = await litellm.acompletion(messages=self.messages + [prompt], stream=True, **self.params)
+        parts = []
+        async for chunk in response:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                yield delta
+        # Only a completed reply joins the history; a failed stream is retried
+        self.messages += [prompt, {"role": "assistant", "content": "".join(parts)}]
+
+
+class LLMSession:
+    """A conversation with history, e.g. one interview"""
+
+    def __init__(self, client: "LLMClient", chat: Any, system_message: str):
+        self.client = client
+        self.chat = chat
+        # The provider re-reads the whole history on every turn
+        self.context_chars = len(system_message)
+
+    @property
+    def streams(self) -> bool:
+        """Whether the chat yields tokens as they arrive rather than one whole reply"""
+        return hasattr(self.chat, "stream_message")
+
+    async def send(self, text: str, priority: str = PRIORITY_LIVE_TURN, call_site: str = "turn") -> str:
+        tokens = estimate_tokens(text) + self.context_chars // 4
+        reply = await self.client.call(
+            lambda: self.chat.send_message(UserMessage(text=text)),
+            priority=priority,
+            tokens=tokens,
+            call_site=call_site
+        )
+        self.context_chars += len(text) + len(reply)
+        return reply
+
+    async def stream(self, text: str, priority: str = PRIORITY_LIVE_TURN,
+                     call_site: str = "turn") -> AsyncIterator[str]:
+        """Yield the reply in chunks; chats without a streaming API yield it whole"""
+        stream_message = getattr(self.chat, "stream_message", None)
+        if stream_message is None:
+            yield await self.send(text, priority, call_site)
+            return
+        tokens = estimate_tokens(text) + self.context_chars // 4
+        self.context_chars += len(text)
+        async for chunk in self.client.call_stream(
+            lambda: stream_message(UserMessage(text=text)),
+            priority=priority,
+            tokens=tokens,
+            call_site=call_site
+        ):
+            self.context_chars += len(chunk)
+            yield chunk
+
+
+class LLMClient:
+    def __init__(self, api_key: str, provider: str = LLM_PROVIDER, model: str = LLM_MODEL,
+                 timeout: float = LLM_TIMEOUT_SECONDS, max_retries: int = LLM_MAX_RETRIES):
+        self.api_key = api_key
+        self.provider = provider
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.breaker = CircuitBreaker()
+        self.scheduler = LLMScheduler()
+        _configure_connection_pool()
+
+    def session(self, session_id: str, system_message: str,
+                history: Optional[List[Dict[str, str]]] = None) -> LLMSession:
+        """`history` replays earlier user/assistant turns, e.g. on reconnect"""
+        history = history or []
+        if LLM_BACKEND == "mock":
+            from mock_llm import MockLlmChat
+            chat = MockLlmChat(session_id=session_id, system_message=system_message,
+                               initial_messages=history)
+        elif LLM_BACKEND == "litellm":
+            chat = LiteLLMChat(self.api_key, self.provider, self.model, system_message, history)
+        else:
+            extra = {}
+            if history:
+                extra["initial_messages"] = [{"role": "system", "content": system_message}] + history
+            chat = LlmChat(
+                api_key=self.api_key,
+                session_id=session_id,
+                system_message=system_message,
+                **extra
+            ).with_model(self.provider, self.model)
+        session = LLMSession(self, chat, system_message)
+        session.context_chars += sum(len(message["content"]) for message in history)
+        return session
+
+    async def complete(self, session_id: str, system_message: str, prompt: str, priority: str,
+                       call_site: str) -> str:
+        """One-shot prompt without conversation history"""
+        return await self.session(session_id, system_message).send(prompt, priority, call_site)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps retries from many sessions from arriving in lockstep
+        return random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+    async def _admit(self, priority: str, tokens: int):
+        """Check the breaker, then wait for scheduler capacity"""
+        self.breaker.before_call()
+        try:
+            await self.scheduler.acquire(priority, tokens)
+        except BaseException:
+            # Never reached the provider, so a half-open trial is handed back
+            self.breaker.abandon_trial()
+            raise
+
+    async def call(self, fn: Callable[[], Awaitable[T]], priority: str = PRIORITY_LIVE_TURN,
+                   tokens: int = LLM_EXPECTED_OUTPUT_TOKENS, call_site: str = "other") -> T:
+        attempt = 0
+        while True:
+            await self._admit(priority, tokens)
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(fn(), self.timeout)
+            except asyncio.CancelledError:
+                self.breaker.abandon_trial()
+                raise
+            except Exception as e:
+                LLM_CALL_SECONDS.labels(call_site, "error").observe(time.perf_counter() - started)
+                self.breaker.record_failure()
+                if attempt >= self.max_retries or self.breaker.state == "open":
+                    raise
+                delay = self._backoff(attempt)
+                logging.warning(f"LLM call failed ({e!r}), retry {attempt + 1} in {delay:.2f}s")
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            LLM_CALL_SECONDS.labels(call_site, "success").observe(time.perf_counter() - started)
+            self.breaker.record_success()
+            return result
+
+    async def call_stream(self, fn: Callable[[], AsyncIterator[str]], priority: str = PRIORITY_LIVE_TURN,
+                          tokens: int = LLM_EXPECTED_OUTPUT_TOKENS, call_site: str = "other") -> AsyncIterator[str]:
+        """Stream with a deadline per chunk; retried only before the first chunk"""
+        attempt = 0
+        while True:
+            await self._admit(priority, tokens)
+            started_at = time.perf_counter()
+            started = False
+            try:
+                iterator = fn().__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(iterator.__anext__(), self.timeout)
+                    except StopAsyncIteration:
+                        break
+                    if not started:
+                        LLM_FIRST_TOKEN_SECONDS.labels(call_site).observe(time.perf_counter() - started_at)
+                    started = True
+                    yield chunk
+            except (asyncio.CancelledError, GeneratorExit):
+                self.breaker.abandon_trial()
+                raise
+            except Exception as e:
+                LLM_CALL_SECONDS.labels(call_site, "error").observe(time.perf_counter() - started_at)
+                self.breaker.record_failure()
+                if started or attempt >= self.max_retries or self.breaker.state == "open":
+                    raise
+                delay = self._backoff(attempt)
+                logging.warning(f"LLM stream failed ({e!r}), retry {attempt + 1} in {delay:.2f}s")
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            LLM_CALL_SECONDS.labels(call_site, "success").observe(time.perf_counter() - started_at)
+            self.breaker.record_success()
+            return
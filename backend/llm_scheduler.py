@@ -0,0 +1,177 @@
+"""Priority-aware admission control for LLM calls.
+
+All calls share one provider quota. Callers wait in a bounded queue per
+priority class and are released highest priority first, as request and
+token buckets allow. Background classes may not drain the buckets below a
+reserve kept for live interview turns.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from metrics import LLM_QUEUE_WAIT_SECONDS
+
+PRIORITY_LIVE_TURN = "live_turn"
+PRIORITY_EVALUATION = "evaluation"
+PRIORITY_ROLE_FIT = "role_fit"
+# Highest priority first
+PRIORITIES = (PRIORITY_LIVE_TURN, PRIORITY_EVALUATION, PRIORITY_ROLE_FIT)
+
+LLM_RATE_RPS = float(os.environ.get('LLM_RATE_RPS', '20'))
+LLM_RATE_TPM = float(os.environ.get('LLM_RATE_TPM', '1000000'))
+LLM_LIVE_RESERVE = float(os.environ.get('LLM_LIVE_RESERVE', '0.2'))
+LLM_QUEUE_LIMITS = {
+    PRIORITY_LIVE_TURN: int(os.environ.get('LLM_QUEUE_LIMIT_LIVE_TURN', '1000')),
+    PRIORITY_EVALUATION: int(os.environ.get('LLM_QUEUE_LIMIT_EVALUATION', '500')),
+    PRIORITY_ROLE_FIT: int(os.environ.get('LLM_QUEUE_LIMIT_ROLE_FIT', '2000')),
+}
+
+
+class SchedulerQueueFull(Exception):
+    """Raised when a priority class already has its maximum number of waiters"""
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, reserve: float = 0.0) -> float:
+        """Seconds until `amount` can be taken while leaving `reserve` of capacity"""
+        self._refill()
+        # Oversized requests would otherwise wait forever
+        needed = min(amount + reserve * self.capacity, self.capacity) - self.tokens
+        return max(0.0, needed / self.rate)
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class _ClassStats:
+    def __init__(self):
+        self.dispatched = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float):
+        self.dispatched += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+
+class LLMScheduler:
+    def __init__(self, requests_per_second: float = LLM_RATE_RPS, tokens_per_minute: float = LLM_RATE_TPM,
+                 live_reserve: float = LLM_LIVE_RESERVE, queue_limits: Optional[Dict[str, int]] = None):
+        # A rate of 0 disables that bucket
+        self.request_bucket = TokenBucket(requests_per_second, max(1.0, requests_per_second)) \
+            if requests_per_second > 0 else None
+        self.token_bucket = TokenBucket(tokens_per_minute / 60, tokens_per_minute) \
+            if tokens_per_minute > 0 else None
+        self.live_reserve = live_reserve
+        self.queue_limits = queue_limits or LLM_QUEUE_LIMITS
+        self.queues: Dict[str, Deque[Tuple[asyncio.Future, int, float]]] = {p: deque() for p in PRIORITIES}
+        self.stats = {p: _ClassStats() for p in PRIORITIES}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def _ensure_dispatcher(self):
+        loop = asyncio.get_running_loop()
+        if self._dispatcher is None or self._dispatcher.done() or self._dispatcher.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._dispatcher = loop.create_task(self._dispatch())
+
+    async def acquire(self, priority: str, tokens: int):
+        """Wait until a call of `priority` costing about `tokens` may start"""
+        queue = self.queues[priority]
+        if len(queue) >= self.queue_limits[priority]:
+            self.stats[priority].rejected += 1
+            raise SchedulerQueueFull(f"{priority} queue is full ({len(queue)} waiting)")
+
+        self._ensure_dispatcher()
+        future = asyncio.get_running_loop().create_future()
+        enqueued_at = time.monotonic()
+        entry = (future, tokens, enqueued_at)
+        queue.append(entry)
+        self._wakeup.set()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if entry in queue:
+                queue.remove(entry)
+            raise
+        waited = time.monotonic() - enqueued_at
+        self.stats[priority].record_wait(waited)
+        LLM_QUEUE_WAIT_SECONDS.labels(priority).observe(waited)
+
+    def _head(self):
+        for priority in PRIORITIES:
+            queue = self.queues[priority]
+            while queue and queue[0][0].done():
+                # Cancelled waiter
+                queue.popleft()
+            if queue:
+                return priority, queue[0]
+        return None, None
+
+    def _wait_time(self, priority: str, tokens: int) -> float:
+        reserve = 0.0 if priority == PRIORITY_LIVE_TURN else self.live_reserve
+        wait = 0.0
+        if self.request_bucket is not None:
+            wait = max(wait, self.request_bucket.wait_time(1, reserve))
+        if self.token_bucket is not None:
+            wait = max(wait, self.token_bucket.wait_time(tokens, reserve))
+        return wait
+
+    async def _dispatch(self):
+        while True:
+            priority, entry = self._head()
+            if entry is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            future, tokens, _ = entry
+            wait = self._wait_time(priority, tokens)
+            if wait > 0:
+                # Sleep until capacity refills or a new (maybe higher priority) waiter arrives
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            if self.request_bucket is not None:
+                self.request_bucket.consume(1)
+            if self.token_bucket is not None:
+                self.token_bucket.consume(tokens)
+            self.queues[priority].popleft()
+            future.set_result(None)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Queue depth and queue wait time per priority class"""
+        now = time.monotonic()
+        snapshot = {}
+        for priority in PRIORITIES:
+            stats = self.stats[priority]
+            queue = self.queues[priority]
+            snapshot[priority] = {
+                "queued": len(queue),
+                "oldest_wait_seconds": round(now - queue[0][2], 3) if queue else 0.0,
+                "dispatched": stats.dispatched,
+                "rejected": stats.rejected,
+                "avg_wait_seconds": round(stats.wait_seconds_total / stats.dispatched, 3) if stats.dispatched else 0.0,
+                "max_wait_seconds": round(stats.wait_seconds_max, 3),
+            }
+        return snapshot
@@ -0,0 +1,93 @@
+"""Event loop lag monitor and blocking-call detector.
+
+A heartbeat task measures how late the loop wakes it up. A watchdog thread
+notices when the heartbeat stops ticking, i.e. some callback is holding the
+loop, and logs the loop thread's stack while it is still blocked.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Optional
+
+from metrics import EVENT_LOOP_BLOCKS, EVENT_LOOP_LAG_SECONDS
+
+LOOP_MONITOR_ENABLED = os.environ.get('LOOP_MONITOR_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+LOOP_MONITOR_INTERVAL_SECONDS = float(os.environ.get('LOOP_MONITOR_INTERVAL_SECONDS', '0.1'))
+LOOP_BLOCK_THRESHOLD_SECONDS = float(os.environ.get('LOOP_BLOCK_THRESHOLD_SECONDS', '0.25'))
+
+APP_DIR = str(Path(__file__).parent)
+
+logger = logging.getLogger("loop_monitor")
+
+
+class LoopMonitor:
+    def __init__(self, interval: float = LOOP_MONITOR_INTERVAL_SECONDS,
+                 threshold: float = LOOP_BLOCK_THRESHOLD_SECONDS):
+        self.interval = interval
+        self.threshold = threshold
+        self.last_tick = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._reported_stall = False
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Start monitoring the running loop; call from inside it"""
+        self._loop_thread_id = threading.get_ident()
+        self.last_tick = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self):
+        while True:
+            deadline = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - deadline)
+            EVENT_LOOP_LAG_SECONDS.observe(lag)
+            if lag >= self.threshold:
+                logger.warning(f"Event loop was blocked for {lag * 1000:.0f}ms")
+            self.last_tick = now
+            self._reported_stall = False
+
+    def _watch(self):
+        # Poll often enough to catch the offender while it still holds the loop
+        while not self._stop.wait(min(self.interval, self.threshold) / 2):
+            stalled = time.monotonic() - self.last_tick - self.interval
+            if stalled < self.threshold or self._reported_stall:
+                continue
+            self._reported_stall = True
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            site = self._blocking_site(frame)
+            EVENT_LOOP_BLOCKS.labels(site).inc()
+            stack = "".join(traceback.format_stack(frame))
+            logger.warning(f"Event loop blocked for over {stalled * 1000:.0f}ms in {site}:\n{stack}")
+
+    @staticmethod
+    def _blocking_site(frame) -> str:
+        """Innermost frame in our own code, so the metric label stays bounded"""
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename.startswith(APP_DIR) and not filename.endswith("loop_monitor.py"):
+                return f"{Path(filename).name}:{frame.f_code.co_name}"
+            frame = frame.f_back
+        return "unknown"
+
+
+loop_monitor = LoopMonitor()
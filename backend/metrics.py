@@ -0,0 +1,93 @@
+"""Prometheus metrics for the backend hot paths, served at /metrics."""
+from typing import Dict, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+from pymongo import monitoring
+
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+LLM_CALL_SECONDS = Histogram(
+    "llm_call_seconds", "LLM call latency per attempt", ["call_site", "outcome"], buckets=LLM_BUCKETS
+)
+LLM_FIRST_TOKEN_SECONDS = Histogram(
+    "llm_first_token_seconds", "Time to first streamed chunk", ["call_site"], buckets=LLM_BUCKETS
+)
+LLM_QUEUE_WAIT_SECONDS = Histogram(
+    "llm_queue_wait_seconds", "Time spent waiting in the LLM scheduler", ["priority"], buckets=LLM_BUCKETS
+)
+MONGO_OPERATION_SECONDS = Histogram(
+    "mongo_operation_seconds", "MongoDB command latency", ["collection", "operation", "outcome"],
+    buckets=FAST_BUCKETS
+)
+UPLOAD_PARSE_SECONDS = Histogram(
+    "upload_parse_seconds", "Upload text extraction time", ["kind", "cached"], buckets=FAST_BUCKETS + (5, 10, 30)
+)
+UPLOAD_BYTES = Histogram(
+    "upload_bytes", "Uploaded document size", ["kind"],
+    buckets=(16e3, 64e3, 256e3, 1e6, 4e6, 16e6, 64e6)
+)
+ACTIVE_WEBSOCKETS = Gauge("active_websockets", "Interview WebSockets held by this worker")
+WEBSOCKET_MESSAGES = Counter(
+    "websocket_messages_total", "Interview WebSocket messages received", ["type"]
+)
+STRUCTURED_OUTPUT_PARSES = Counter(
+    "llm_structured_output_total", "Structured LLM replies by parse outcome", ["call_site", "outcome"]
+)
+BACKGROUND_JOBS = Counter(
+    "background_jobs_total", "Durable background job attempts by outcome", ["kind", "outcome"]
+)
+BACKGROUND_JOB_WAIT_SECONDS = Histogram(
+    "background_job_wait_seconds", "Time a due job waited before a worker claimed it", ["kind"],
+    buckets=LLM_BUCKETS
+)
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds", "Delay of the loop monitor heartbeat past its deadline",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+EVENT_LOOP_BLOCKS = Counter(
+    "event_loop_blocks_total", "Callbacks that blocked the event loop past the threshold", ["site"]
+)
+
+# Client-supplied message types are bounded to these label values
+KNOWN_MESSAGE_TYPES = {
+    "ping", "candidate_response", "integrity_flag", "integrity_violation", "end_interview"
+}
+
+
+def count_websocket_message(message_type) -> None:
+    WEBSOCKET_MESSAGES.labels(message_type if message_type in KNOWN_MESSAGE_TYPES else "other").inc()
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every driver command; register via the client's event_listeners"""
+
+    # Commands that aren't collection operations
+    _IGNORED = {"hello", "isMaster", "ismaster", "ping", "saslStart", "saslContinue", "endSessions", "buildInfo"}
+
+    def __init__(self):
+        self._collections: Dict[Tuple[str, int], str] = {}
+
+    def started(self, event):
+        if event.command_name in self._IGNORED:
+            return
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            # getMore carries the cursor id; its collection is a separate field
+            collection = event.command.get("collection", "unknown")
+        self._collections[(str(event.connection_id), event.request_id)] = collection
+
+    def _observe(self, event, outcome: str):
+        collection = self._collections.pop((str(event.connection_id), event.request_id), None)
+        if collection is None:
+            return
+        MONGO_OPERATION_SECONDS.labels(collection, event.command_name, outcome).observe(
+            event.duration_micros / 1e6
+        )
+
+    def succeeded(self, event):
+        self._observe(event, "success")
+
+    def failed(self, event):
+        self._observe(event, "error")
+
@@ -0,0 +1,143 @@
+"""Offline stand-in for LlmChat, used when LLM_BACKEND=mock.
+
+Replies are canned but shaped like the real ones (role fit JSON, profile
+extraction, answer scores, evaluation JSON, interview questions), so the
+whole interview flow runs without network access. Latency is drawn from
+MOCK_LLM_LATENCY_MS:
+
+    fixed:<ms>                   e.g. fixed:500
+    uniform:<low_ms>:<high_ms>   e.g. uniform:200:1500
+    normal:<mean_ms>:<stddev_ms>
+    lognormal:<median_ms>:<sigma>
+
+The sampled latency is the time to the first token; streamed replies then
+emit one word every MOCK_LLM_TOKEN_DELAY_MS. MOCK_LLM_ERROR_RATE makes that
+fraction of calls fail.
+"""
+import asyncio
+import json
+import math
+import os
+import random
+from typing import AsyncIterator, Callable, List, Optional
+
+MOCK_LLM_LATENCY_MS = os.environ.get('MOCK_LLM_LATENCY_MS', 'lognormal:800:0.4')
+MOCK_LLM_TOKEN_DELAY_MS = float(os.environ.get('MOCK_LLM_TOKEN_DELAY_MS', '20'))
+MOCK_LLM_ERROR_RATE = float(os.environ.get('MOCK_LLM_ERROR_RATE', '0'))
+
+QUESTIONS = [
+    "Can you walk me through a recent project you are proud of and your role in it?",
+    "How did you approach testing and reliability in that work?",
+    "Tell me about a time you had to make a difficult technical trade-off.",
+    "How do you keep a large codebase maintainable as the team grows?",
+    "Describe a production incident you handled and what you changed afterwards.",
+]
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """Return a sampler of latencies in seconds for a MOCK_LLM_LATENCY_MS spec"""
+    kind, *params = spec.split(":")
+    values = [float(p) for p in params]
+    if kind == "fixed":
+        return lambda: values[0] / 1000
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1]) / 1000
+    if kind == "normal":
+        return lambda: max(0.0, random.gauss(values[0], values[1])) / 1000
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(math.log(values[0]), values[1]) / 1000
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class MockLlmError(Exception):
+    pass
+
+
+class MockLlmChat:
+    """Mimics the LlmChat API used by llm_client: send_message and stream_message"""
+
+    def __init__(self, session_id: str, system_message: str, initial_messages: Optional[List[dict]] = None):
+        self.session_id = session_id
+        self.system_message = system_message
+        self.turns = sum(1 for message in initial_messages or [] if message.get("role") == "user")
+        self.sample_latency = parse_latency(MOCK_LLM_LATENCY_MS)
+        self.rng = random.Random(session_id)
+
+    def _reply(self, text: str) -> str:
+        if "Analyze the candidate's fit" in text:
+            return json.dumps({
+                "skill_match_level": self.rng.choice(["high", "medium", "low"]),
+                "experience_relevance": "Relevant experience in similar roles",
+                "project_alignment": "Projects overlap with the role's core work",
+                "analysis_summary": "Mock analysis generated offline",
+                "match_score": self.rng.randint(30, 95),
+            })
+        if "Extract a structured profile from this job description" in text:
+            return json.dumps({
+                "required_skills": ["Python", "FastAPI", "MongoDB"],
+                "experience": "Several years building backend services",
+                "responsibilities": "Design and run the interview platform's APIs",
+            })
+        if "Extract a structured profile from this resume" in text:
+            return json.dumps({
+                "skills": ["Python", "Django", "AWS"],
+                "projects": ["Built a payments API", "Migrated a monolith to services"],
+                "experience": "Backend engineer with five years of experience",
+            })
+        if "Score this single interview answer" in text:
+            return json.dumps({
+                "skill_alignment": self.rng.randint(40, 95),
+                "experience_relevance": self.rng.randint(40, 95),
+                "project_applicability": self.rng.randint(40, 95),
+                "communication_clarity": self.rng.randint(40, 95),
+                "depth_of_understanding": self.rng.randint(40, 95),
+                "consistency_with_resume": self.rng.randint(40, 95),
+                "note": "Mock score",
+            })
+        if "Summarize this interview" in text:
+            return json.dumps({
+                "behavioral_observations": {
+                    "confidence_indicators": "Medium",
+                    "nervousness_patterns": "None observed",
+                    "responsiveness": "Answered every question",
+                },
+                "strengths": ["Clear communication", "Relevant experience"],
+                "weaknesses": ["Limited depth on trade-offs"],
+            })
+        if "evaluation report" in text:
+            return json.dumps({
+                "overall_score": self.rng.randint(40, 90),
+                "recommendation": "Moderate fit",
+                "role_fit": {"skill_alignment": 70, "experience_relevance": 70, "project_applicability": 70},
+                "performance": {"communication_clarity": 70, "depth_of_understanding": 70, "consistency_with_resume": 70},
+                "behavioral_observations": {
+                    "confidence_indicators": "Medium",
+                    "nervousness_patterns": "None observed",
+                    "responsiveness": "Good",
+                },
+                "strengths": ["Clear communication"],
+                "weaknesses": ["Limited depth"],
+            })
+
+        question = QUESTIONS[self.turns % len(QUESTIONS)]
+        self.turns += 1
+        if self.turns == 1:
+            return f"Hello, thanks for joining. I'll be your interviewer today. {question}"
+        return f"Thanks, that's helpful. {question}"
+
+    async def _wait_first_token(self):
+        await asyncio.sleep(self.sample_latency())
+        if self.rng.random() < MOCK_LLM_ERROR_RATE:
+            raise MockLlmError("Injected mock LLM failure")
+
+    async def send_message(self, message) -> str:
+        await self._wait_first_token()
+        return self._reply(message.text)
+
+    async def stream_message(self, message) -> AsyncIterator[str]:
+        await self._wait_first_token()
+        words: List[str] = self._reply(message.text).split(" ")
+        for index, word in enumerate(words):
+            if index:
+                await asyncio.sleep(MOCK_LLM_TOKEN_DELAY_MS / 1000)
+            yield word if index == 0 else " " + word
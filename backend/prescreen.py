@@ -0,0 +1,106 @@
+"""Deterministic keyword pre-screen for role fit.
+
+Scores how well each resume covers a JD's vocabulary, BM25-style: every JD
+term is weighted by its sublinear frequency in the JD, a resume's hit on it
+saturates with term frequency and is normalized for resume length. All pairs
+of a batch are scored with one matrix product, so thousands of candidates
+score in milliseconds. The score is an instant first pass and the fallback
+when the LLM analysis is unavailable.
+
+Weights depend only on the JD/resume pair, never on the rest of the batch,
+so a pair scores the same in a single setup and in a bulk run.
+"""
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Reference resume length for length normalization, in tokens
+BM25_REFERENCE_LENGTH = 400
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+STOPWORDS = frozenset("""
+a about above across after all also am an and any are as at be been being both but by can
+could did do does doing during each either etc for from had has have having he her here hers
+him his how i if in into is it its just me more most my no nor not of off on once only or
+other our ours out over own per same she should so some such than that the their theirs them
+then there these they this those through to too under until up upon us very via was we were
+what when where which while who whom why will with within without would you your yours
+ability able candidate candidates experience experienced including looking must plus preferred
+required requirements role strong team work working years year
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    return [token for token in tokens if token not in STOPWORDS and not token.isdigit()]
+
+
+def query_weights(terms: Counter) -> Dict[str, float]:
+    """Sublinear JD term frequency"""
+    return {term: 1.0 + math.log(count) for term, count in terms.items()}
+
+
+def bm25_hits(frequencies: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """BM25 saturation, capped so a single hit at reference length counts fully"""
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / BM25_REFERENCE_LENGTH)
+    return np.minimum(frequencies * (BM25_K1 + 1) / (frequencies + norm), 1.0)
+
+
+def coverage_to_score(coverage: np.ndarray) -> np.ndarray:
+    # Even a strong resume misses much of a JD's wording; the square root puts
+    # typical coverage on the same scale as the LLM's match_score
+    return np.round(100 * np.sqrt(coverage))
+
+
+def prescreen_matrix(jd_texts: Sequence[str], resume_texts: Sequence[str]) -> np.ndarray:
+    """Match scores 0-100, shaped (len(jd_texts), len(resume_texts))"""
+    jd_terms = [Counter(tokenize(text)) for text in jd_texts]
+    vocabulary = {}
+    for terms in jd_terms:
+        for term in terms:
+            vocabulary.setdefault(term, len(vocabulary))
+    scores = np.zeros((len(jd_texts), len(resume_texts)), dtype=np.float64)
+    if not vocabulary or not len(resume_texts):
+        return scores
+
+    weights = np.zeros((len(jd_texts), len(vocabulary)), dtype=np.float64)
+    for row, terms in enumerate(jd_terms):
+        for term, weight in query_weights(terms).items():
+            weights[row, vocabulary[term]] = weight
+
+    # Resume term frequencies over the JD vocabulary
+    frequencies = np.zeros((len(resume_texts), len(vocabulary)), dtype=np.float64)
+    lengths = np.zeros(len(resume_texts), dtype=np.float64)
+    for row, text in enumerate(resume_texts):
+        tokens = tokenize(text)
+        lengths[row] = len(tokens)
+        ids = [vocabulary[token] for token in tokens if token in vocabulary]
+        if ids:
+            frequencies[row] = np.bincount(ids, minlength=len(vocabulary))
+
+    hits = bm25_hits(frequencies, lengths[:, None])
+    coverage = (weights @ hits.T) / np.maximum(weights.sum(axis=1, keepdims=True), 1e-9)
+    return coverage_to_score(coverage)
+
+
+def prescreen_scores(jd_text: str, resume_texts: Sequence[str]) -> List[int]:
+    """Match score 0-100 for each resume against one JD"""
+    return [int(score) for score in prescreen_matrix([jd_text], resume_texts)[0]]
+
+
+def prescreen_score(jd_text: str, resume_text: str) -> int:
+    return prescreen_scores(jd_text, [resume_text])[0]
+
+
+def match_level(score: int) -> str:
+    if score >= 70:
+        return "high"
+    if score >= 40:
+        return "medium"
+    return "low"
@@ -0,0 +1,102 @@
+"""Compact, token-budgeted JD and resume profiles for interview prompts.
+
+Setup runs one structured extraction per document. The interviewer's system
+message is re-sent on every turn, so it carries these profiles instead of
+the raw JD and resume text.
+"""
+import os
+from typing import Any, Dict, List
+
+from structured_output import extract_json
+
+PROFILE_TOKEN_BUDGET = int(os.environ.get('PROFILE_TOKEN_BUDGET', '300'))
+PROFILE_SOURCE_MAX_CHARS = int(os.environ.get('PROFILE_SOURCE_MAX_CHARS', '12000'))
+MAX_SKILLS = 25
+MAX_PROJECTS = 8
+
+# Same ~4 characters per token estimate as llm_client.estimate_tokens
+CHARS_PER_TOKEN = 4
+
+
+def truncate_to_budget(text: str, budget: int = PROFILE_TOKEN_BUDGET) -> str:
+    """Collapse whitespace and cut at a word boundary within the token budget"""
+    text = " ".join(text.split())
+    limit = budget * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + " ..."
+
+
+def jd_extraction_prompt(jd_text: str) -> str:
+    return f"""Extract a structured profile from this job description.
+
+Job Description:
+{jd_text[:PROFILE_SOURCE_MAX_CHARS]}
+
+Return ONLY valid JSON:
+{{
+    "required_skills": ["skill", ...],
+    "experience": "one sentence on the experience required",
+    "responsibilities": "one or two sentences on what the role does"
+}}
+"""
+
+
+def resume_extraction_prompt(resume_text: str) -> str:
+    return f"""Extract a structured profile from this resume.
+
+Resume:
+{resume_text[:PROFILE_SOURCE_MAX_CHARS]}
+
+Return ONLY valid JSON:
+{{
+    "skills": ["skill", ...],
+    "projects": ["one line per notable project", ...],
+    "experience": "one or two sentences summarizing roles and years of experience"
+}}
+"""
+
+
+def parse_extraction(response: str) -> Dict[str, Any]:
+    return extract_json(response) or {}
+
+
+def clean_list(values: Any, limit: int) -> List[str]:
+    if not isinstance(values, list):
+        return []
+    cleaned = []
+    seen = set()
+    for value in values:
+        value = " ".join(str(value).split())[:200]
+        if value and value.lower() not in seen:
+            seen.add(value.lower())
+            cleaned.append(value)
+    return cleaned[:limit]
+
+
+def sentence(label: str, text: Any) -> str:
+    text = " ".join(str(text).split()).rstrip(".")
+    return f"{label}: {text}." if text else ""
+
+
+def build_jd_profile(title: str, data: Dict[str, Any], raw_text: str) -> str:
+    """Profile from extracted fields; falls back to budgeted raw text"""
+    if not data:
+        return truncate_to_budget(f"Role: {title}. {raw_text}")
+    parts = [f"Role: {title}."]
+    skills = clean_list(data.get("required_skills"), MAX_SKILLS)
+    parts.append(sentence("Required skills", ", ".join(skills)))
+    parts.append(sentence("Experience", data.get("experience", "")))
+    parts.append(sentence("Responsibilities", data.get("responsibilities", "")))
+    return truncate_to_budget(" ".join(part for part in parts if part))
+
+
+def build_resume_profile(name: str, data: Dict[str, Any], raw_text: str) -> str:
+    """Profile from extracted fields; falls back to budgeted raw text"""
+    if not data:
+        return truncate_to_budget(f"Candidate: {name}. {raw_text}")
+    parts = [f"Candidate: {name}."]
+    parts.append(sentence("Experience", data.get("experience", "")))
+    parts.append(sentence("Skills", ", ".join(clean_list(data.get("skills"), MAX_SKILLS))))
+    parts.append(sentence("Projects", "; ".join(clean_list(data.get("projects"), MAX_PROJECTS))))
+    return truncate_to_budget(" ".join(part for part in parts if part))
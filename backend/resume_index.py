@@ -0,0 +1,224 @@
+"""Inverted index over candidate resumes for "who fits this JD" search.
+
+Each resume's term frequencies (resume text plus extracted skills) are
+persisted in `resume_index` when the resume is written. Every worker keeps
+an in-memory inverted index built from that collection: one compact array of
+resume slots and frequencies per term. A search scores only the postings of
+the JD's terms, using the same BM25-style coverage as the pre-screen, so a
+match scores the same here as in setup.
+
+Workers pick up each other's writes by re-reading recently indexed entries
+before a search. A re-indexed resume (e.g. created with skills elsewhere)
+gets a new slot and the old one is tombstoned; once tombstones make up a
+large share of the slots the arrays are compacted.
+"""
+import asyncio
+import logging
+import os
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pymongo import UpdateOne
+
+from prescreen import tokenize, query_weights, bm25_hits, coverage_to_score
+
+RESUME_SEARCH_LIMIT = int(os.environ.get('RESUME_SEARCH_LIMIT', '20'))
+RESUME_SEARCH_MAX_LIMIT = int(os.environ.get('RESUME_SEARCH_MAX_LIMIT', '200'))
+
+logger = logging.getLogger("resume_index")
+
+
+def _version(indexed_at: datetime) -> datetime:
+    """Mongo stores naive UTC datetimes at millisecond precision"""
+    if indexed_at.tzinfo is not None:
+        indexed_at = indexed_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return indexed_at.replace(microsecond=indexed_at.microsecond // 1000 * 1000)
+
+
+def resume_terms(text: str, skills: Sequence[str] = ()) -> Tuple[Counter, int]:
+    """Term frequencies and length; listed skills count on top of the text"""
+    tokens = tokenize(text)
+    for skill in skills:
+        tokens.extend(tokenize(skill))
+    return Counter(tokens), len(tokens)
+
+
+class ResumeIndex:
+    # Entries written by other workers can land slightly out of timestamp
+    # order, so a refresh looks back this far; re-reading is idempotent
+    REFRESH_SLACK = timedelta(seconds=5)
+    # Compact once this share of slots, and at least COMPACT_MIN_DEAD, are tombstones
+    COMPACT_RATIO = 0.25
+    COMPACT_MIN_DEAD = 1024
+
+    def __init__(self, collection):
+        self.collection = collection
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._slot_ids: List[str] = []
+        self._slot_versions: List[Any] = []
+        self._lengths = array("f")
+        self._alive = array("b")
+        self._slot_of: Dict[str, int] = {}
+        self._dead = 0
+        self._synced_at: Optional[datetime] = None
+        self._loading: Optional[asyncio.Task] = None
+        self._resumes_collection = None
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    # Writes
+
+    async def add(self, resume_id: str, text: str, skills: Sequence[str] = ()):
+        await self.add_many([(resume_id, text, skills)])
+
+    async def add_many(self, resumes: Sequence[Tuple[str, str, Sequence[str]]]):
+        """Persist and index resumes; re-adding a resume replaces its entry"""
+        if not resumes:
+            return
+        now = _version(datetime.now(timezone.utc))
+        entries = []
+        for resume_id, text, skills in resumes:
+            terms, length = resume_terms(text, skills)
+            entries.append({
+                "resume_id": resume_id,
+                # Terms may contain dots (node.js), so they can't be field names
+                "terms": [[term, count] for term, count in terms.items()],
+                "length": length,
+                "indexed_at": now
+            })
+        await self.collection.bulk_write([
+            UpdateOne({"resume_id": entry["resume_id"]}, {"$set": entry}, upsert=True)
+            for entry in entries
+        ], ordered=False)
+        for entry in entries:
+            self._index_entry(entry)
+        self._maybe_compact()
+
+    def _index_entry(self, entry: Dict[str, Any]):
+        resume_id = entry["resume_id"]
+        version = _version(entry["indexed_at"])
+        slot = self._slot_of.get(resume_id)
+        if slot is not None:
+            if version <= self._slot_versions[slot]:
+                return
+            self._alive[slot] = 0
+            self._dead += 1
+        slot = len(self._slot_ids)
+        self._slot_ids.append(resume_id)
+        self._slot_versions.append(version)
+        self._lengths.append(entry["length"])
+        self._alive.append(1)
+        self._slot_of[resume_id] = slot
+        for term, count in entry["terms"]:
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("I"), array("f"))
+            postings[0].append(slot)
+            postings[1].append(count)
+
+    def _maybe_compact(self):
+        if self._dead < max(self.COMPACT_MIN_DEAD, self.COMPACT_RATIO * len(self._slot_ids)):
+            return
+        alive = np.frombuffer(self._alive, dtype=np.int8) == 1
+        # Old slot -> new slot for the slots that survive
+        remap = (np.cumsum(alive) - 1).astype(np.uint32)
+        for term in list(self._postings):
+            slots, frequencies = self._postings[term]
+            old_slots = np.frombuffer(slots, dtype=np.uint32)
+            keep = alive[old_slots]
+            if not keep.any():
+                del self._postings[term]
+                continue
+            new_slots, new_frequencies = array("I"), array("f")
+            new_slots.frombytes(remap[old_slots[keep]].tobytes())
+            new_frequencies.frombytes(np.frombuffer(frequencies, dtype=np.float32)[keep].tobytes())
+            self._postings[term] = (new_slots, new_frequencies)
+        survivors = np.flatnonzero(alive)
+        self._slot_ids = [self._slot_ids[slot] for slot in survivors]
+        self._slot_versions = [self._slot_versions[slot] for slot in survivors]
+        lengths = array("f")
+        lengths.frombytes(np.frombuffer(self._lengths, dtype=np.float32)[alive].tobytes())
+        self._lengths = lengths
+        self._alive = array("b", [1] * len(self._slot_ids))
+        self._slot_of = {resume_id: slot for slot, resume_id in enumerate(self._slot_ids)}
+        logger.info(f"Resume index compacted: dropped {self._dead} dead slots")
+        self._dead = 0
+
+    # Loading and cross-worker sync
+
+    async def load(self, resumes_collection=None):
+        """Build the in-memory index, indexing any resume written before it existed"""
+        async for entry in self.collection.find({}, {"_id": 0}):
+            self._index_entry(entry)
+            self._advance(entry["indexed_at"])
+        self._maybe_compact()
+        if resumes_collection is None:
+            return
+        missing = []
+        async for resume in resumes_collection.find({}, {"_id": 0, "id": 1, "experience": 1, "skills": 1}):
+            if resume["id"] not in self._slot_of:
+                missing.append((resume["id"], resume.get("experience", ""), resume.get("skills", [])))
+            if len(missing) >= 1000:
+                await self.add_many(missing)
+                missing = []
+        await self.add_many(missing)
+        logger.info(f"Resume index loaded with {len(self)} resumes")
+
+    def start_loading(self, resumes_collection=None):
+        self._resumes_collection = resumes_collection
+        self._loading = asyncio.create_task(self.load(resumes_collection))
+
+    async def refresh(self):
+        if self._loading is not None and self._loading.done():
+            error = "cancelled" if self._loading.cancelled() else self._loading.exception()
+            if error is not None:
+                # e.g. Mongo was unreachable at startup; entries already read are
+                # kept and re-reading them is idempotent
+                logger.warning(f"Resume index load failed, retrying: {error}")
+                self.start_loading(self._resumes_collection)
+        if self._loading is not None:
+            await asyncio.shield(self._loading)
+        since = (self._synced_at or datetime.min + self.REFRESH_SLACK) - self.REFRESH_SLACK
+        async for entry in self.collection.find({"indexed_at": {"$gte": since}}, {"_id": 0}):
+            self._index_entry(entry)
+            self._advance(entry["indexed_at"])
+        self._maybe_compact()
+
+    def _advance(self, indexed_at: datetime):
+        indexed_at = _version(indexed_at)
+        if self._synced_at is None or indexed_at > self._synced_at:
+            self._synced_at = indexed_at
+
+    # Search
+
+    def search(self, jd_text: str, skills: Sequence[str] = (),
+               limit: int = RESUME_SEARCH_LIMIT) -> List[Tuple[str, int]]:
+        """Top `limit` (resume_id, match score 0-100), best first"""
+        query, _ = resume_terms(jd_text, skills)
+        weights = query_weights(query)
+        total_weight = sum(weights.values())
+        if not total_weight or not self._slot_ids:
+            return []
+        lengths = np.frombuffer(self._lengths, dtype=np.float32)
+        coverage = np.zeros(len(self._slot_ids), dtype=np.float64)
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            slots = np.frombuffer(postings[0], dtype=np.uint32)
+            frequencies = np.frombuffer(postings[1], dtype=np.float32)
+            # A slot has at most one posting per term, so fancy-index += is safe
+            coverage[slots] += weight * bm25_hits(frequencies, lengths[slots])
+        coverage[np.frombuffer(self._alive, dtype=np.int8) == 0] = 0
+        coverage /= total_weight
+
+        matched = np.flatnonzero(coverage)
+        if matched.size > limit:
+            matched = matched[np.argpartition(-coverage[matched], limit - 1)[:limit]]
+        matched = matched[np.argsort(-coverage[matched], kind="stable")]
+        scores = coverage_to_score(coverage[matched])
+        return [(self._slot_ids[slot], int(score)) for slot, score in zip(matched, scores)]
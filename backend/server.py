@@ -1,54 +1,148 @@
-from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, WebSocket, WebSocketDisconnect, Query, Response
 from fastapi.responses import StreamingResponse
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import uuid
+import time
 from datetime import datetime, timezone
-import PyPDF2
-import docx
-import io
 import json
-from emergentintegrations.llm.chat import LlmChat, UserMessage
+import base64
 import asyncio
+import hashlib
+from cache import TieredCache, SingleFlight
+from llm_client import LLMClient, LLMSession, LLM_PROVIDER, LLM_MODEL
+from llm_scheduler import PRIORITY_LIVE_TURN, PRIORITY_EVALUATION, PRIORITY_ROLE_FIT
+from metrics import (
+    MongoCommandMetrics, ACTIVE_WEBSOCKETS, UPLOAD_PARSE_SECONDS, UPLOAD_BYTES,
+    count_websocket_message
+)
+from loop_monitor import loop_monitor, LOOP_MONITOR_ENABLED
+from indexes import reconcile_indexes, index_usage
+from backplane import Backplane, create_backplane
+from flag_buffer import IntegrityFlagBuffer
+from job_queue import JobQueue, RetryLater
+from analytics import AnalyticsRollups, ANALYTICS_JOB_TITLE_LIMIT
+from structured_output import parse_structured
+from prescreen import prescreen_score, prescreen_scores, match_level
+from resume_index import ResumeIndex, RESUME_SEARCH_LIMIT, RESUME_SEARCH_MAX_LIMIT
+from profiles import (
+    MAX_SKILLS, MAX_PROJECTS, truncate_to_budget, jd_extraction_prompt, resume_extraction_prompt,
+    parse_extraction, clean_list, build_jd_profile, build_resume_profile
+)
+from document_parser import parser_pool, get_extractor, ParserSaturated, ParseTimeout
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, event_listeners=[MongoCommandMetrics()])
 db = client[os.environ.get('DB_NAME', 'test_database')]
 
 # Get API key
 EMERGENT_KEY = os.environ.get('EMERGENT_LLM_KEY', '')
 
+# Shared LLM client; every call site goes through it
+llm = LLMClient(api_key=EMERGENT_KEY)
+
+ROLE_FIT_STREAM_TIMEOUT_SECONDS = 120
+BULK_ROLE_FIT_CONCURRENCY = int(os.environ.get('BULK_ROLE_FIT_CONCURRENCY', '8'))
+BULK_SETUP_MAX_CANDIDATES = int(os.environ.get('BULK_SETUP_MAX_CANDIDATES', '1000'))
+# 0 sends every bulk candidate to the LLM; otherwise only the pre-screen top k
+BULK_ROLE_FIT_TOP_K = int(os.environ.get('BULK_ROLE_FIT_TOP_K', '0'))
+# How long an evaluation waits for answers still being scored, re-checking
+# every ANSWER_SCORING_RECHECK_SECONDS
+ANSWER_SCORING_WAIT_SECONDS = float(os.environ.get('ANSWER_SCORING_WAIT_SECONDS', '20'))
+ANSWER_SCORING_RECHECK_SECONDS = float(os.environ.get('ANSWER_SCORING_RECHECK_SECONDS', '1'))
+GREETING_PREGEN_WAIT_SECONDS = float(os.environ.get('GREETING_PREGEN_WAIT_SECONDS', '1'))
+INTERVIEW_PAGE_SIZE = 100
+INTERVIEW_MAX_PAGE_SIZE = 500
+
+# Extracted upload text, keyed by content hash
+upload_cache = TieredCache(
+    db.parsed_documents,
+    maxsize=int(os.environ.get('UPLOAD_CACHE_SIZE', '256'))
+)
+
+# Role fit analyses, keyed by normalized JD/resume/model hash
+role_fit_cache = TieredCache(
+    db.role_fit_cache,
+    maxsize=int(os.environ.get('ROLE_FIT_CACHE_SIZE', '1024')),
+    ttl=float(os.environ.get('ROLE_FIT_CACHE_TTL_SECONDS', str(24 * 3600)))
+)
+role_fit_flights = SingleFlight()
+
+# Per-answer scoring runs in the background while the interview continues
+answer_scoring_tasks: set = set()
+
+# Inverted index over resume text and skills for candidate search
+resume_index = ResumeIndex(db.resume_index)
+
+# JD/resume profile extractions started by setup
+profile_jobs: set = set()
+
+# Opening questions generated before the candidate's socket connects
+greeting_jobs: Dict[str, asyncio.Task] = {}
+
+# Dashboard counters, bumped by the interview write paths
+analytics = AnalyticsRollups(db.analytics_rollups)
+
+# Integrity flags are coalesced per interview before hitting Mongo
+flag_buffer = IntegrityFlagBuffer(db.interviews, on_flush=analytics.flags_pushed)
+
+# Durable background jobs; evaluations survive dropped sockets and restarts
+job_queue = JobQueue(db.jobs)
+EVALUATION_JOB = "evaluation"
+
+# Role fit analyses started by setup get their own workers, so a large bulk
+# setup doesn't hold up evaluations
+role_fit_queue = JobQueue(db.jobs, workers=BULK_ROLE_FIT_CONCURRENCY)
+ROLE_FIT_JOB = "role_fit"
+ROLE_FIT_POLL_SECONDS = 1
+
 app = FastAPI()
 api_router = APIRouter(prefix="/api")
 
 # WebSocket connections manager
 class ConnectionManager:
-    def __init__(self):
+    def __init__(self, backplane: Backplane):
         self.active_connections: Dict[str, WebSocket] = {}
+        self.backplane = backplane
 
     async def connect(self, interview_id: str, websocket: WebSocket):
         await websocket.accept()
         self.active_connections[interview_id] = websocket
 
-    def disconnect(self, interview_id: str):
+    def disconnect(self, interview_id: str, websocket: Optional[WebSocket] = None):
+        # A stale handler must not drop the socket of a newer reconnect
+        if websocket is not None and self.active_connections.get(interview_id) is not websocket:
+            return
         if interview_id in self.active_connections:
             del self.active_connections[interview_id]
 
     async def send_message(self, interview_id: str, message: dict):
         if interview_id in self.active_connections:
             await self.active_connections[interview_id].send_json(message)
+        else:
+            # The socket may be held by another worker
+            await self.backplane.publish(interview_id, message)
+
+    async def deliver_local(self, interview_id: str, message: dict):
+        """Backplane handler; drops messages for sockets this worker doesn't hold"""
+        websocket = self.active_connections.get(interview_id)
+        if websocket is not None:
+            await websocket.send_json(message)
 
-manager = ConnectionManager()
+manager = ConnectionManager(create_backplane(db))
+ACTIVE_WEBSOCKETS.set_function(lambda: len(manager.active_connections))
 
 # Models
 class JobDescription(BaseModel):
@@ -58,6 +152,7 @@ class JobDescription(BaseModel):
     required_skills: List[str]
     preferred_experience: str
     role_expectations: str
+    profile: str = ""  # compact summary used in interview prompts
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class CandidateResume(BaseModel):
@@ -68,6 +163,7 @@ class CandidateResume(BaseModel):
     skills: List[str]
     experience: str
     projects: List[str]
+    profile: str = ""  # compact summary used in interview prompts
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class IntegrityFlag(BaseModel):
@@ -80,12 +176,17 @@ class Interview(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     job_description_id: str
     candidate_resume_id: str
-    status: str  # scheduled, in_progress, completed
+    status: str  # scheduled, in_progress, completed, terminated
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
     questions_asked: List[str] = []
     integrity_flags: List[Dict[str, Any]] = []
     evaluation: Optional[Dict[str, Any]] = None
+    role_fit_status: str = "pending"  # pending, completed, failed
+    role_fit_analysis: Optional[Dict[str, Any]] = None
+    prescreen_score: Optional[int] = None  # keyword match score, available at setup
+    answer_scores: List[Dict[str, Any]] = []
+    conversation: List[Dict[str, str]] = []  # user/assistant turns, for resuming
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class InterviewSetupRequest(BaseModel):
@@ -95,6 +196,17 @@ class InterviewSetupRequest(BaseModel):
     candidate_name: str
     candidate_email: str
 
+class BulkCandidate(BaseModel):
+    resume_text: Optional[str] = None
+    candidate_name: str
+    candidate_email: str
+
+class BulkInterviewSetupRequest(BaseModel):
+    jd_text: Optional[str] = None
+    job_title: str
+    candidates: List[BulkCandidate]
+    llm_top_k: Optional[int] = None  # defaults to BULK_ROLE_FIT_TOP_K
+
 class RoleFitAnalysis(BaseModel):
     skill_match_level: str
     experience_relevance: str
@@ -102,6 +214,20 @@ class RoleFitAnalysis(BaseModel):
     analysis_summary: str
     match_score: int
 
+class AnswerScore(BaseModel):
+    skill_alignment: float
+    experience_relevance: float
+    project_applicability: float
+    communication_clarity: float
+    depth_of_understanding: float
+    consistency_with_resume: float
+    note: str = ""
+
+class EvaluationSummary(BaseModel):
+    behavioral_observations: Dict[str, Any]
+    strengths: List[str]
+    weaknesses: List[str]
+
 class EvaluationReport(BaseModel):
     interview_id: str
     role_fit: Dict[str, Any]
@@ -113,35 +239,80 @@ class EvaluationReport(BaseModel):
     recommendation: str
 
 # Helper functions
-def extract_text_from_pdf(file_content: bytes) -> str:
-    try:
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        return text
-    except Exception as e:
-        logging.error(f"Error extracting PDF: {e}")
-        return ""
+async def extract_upload_text(file: UploadFile, kind: str) -> Dict[str, Any]:
+    """Parse an uploaded PDF/DOCX off the event loop, reusing cached text for identical bytes"""
+    extractor = get_extractor(file.filename or "")
+    if extractor is None:
+        raise HTTPException(status_code=400, detail="Only PDF and DOCX files supported")
+
+    content = await file.read()
+    UPLOAD_BYTES.labels(kind).observe(len(content))
+    content_hash = hashlib.sha256(content).hexdigest()
+    cache_key = f"{extractor.__name__}:{content_hash}"
+
+    started = time.perf_counter()
+    text = await upload_cache.get(cache_key)
+    if text is not None:
+        UPLOAD_PARSE_SECONDS.labels(kind, "true").observe(time.perf_counter() - started)
+        return {"text": text, "content_hash": content_hash, "cached": True}
 
-def extract_text_from_docx(file_content: bytes) -> str:
     try:
-        doc = docx.Document(io.BytesIO(file_content))
-        text = "\n".join([para.text for para in doc.paragraphs])
-        return text
-    except Exception as e:
-        logging.error(f"Error extracting DOCX: {e}")
-        return ""
+        text = await parser_pool.extract(extractor, content)
+        UPLOAD_PARSE_SECONDS.labels(kind, "false").observe(time.perf_counter() - started)
+    except ParserSaturated:
+        raise HTTPException(
+            status_code=503,
+            detail="Document parser is busy, please retry shortly",
+            headers={"Retry-After": "5"}
+        )
+    except ParseTimeout:
+        raise HTTPException(status_code=504, detail="Document parsing timed out")
+
+    # Empty text means the parse failed; let the next upload try again
+    if text:
+        await upload_cache.set(cache_key, text)
+    return {"text": text, "content_hash": content_hash, "cached": False}
+
+async def parse_llm_json(response: str, model, call_site: str, priority: str,
+                         defaults: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Validated JSON from an LLM reply; a malformed reply gets one repair call"""
+    async def repair(prompt: str) -> str:
+        return await llm.complete(
+            session_id=f"json_repair_{uuid.uuid4()}",
+            system_message="You correct malformed JSON so that it matches a schema.",
+            prompt=prompt,
+            priority=priority,
+            call_site=f"{call_site}_repair"
+        )
+    return await parse_structured(response, model, call_site, repair=repair, defaults=defaults)
+
+def role_fit_cache_key(jd_text: str, resume_text: str) -> str:
+    normalized = "\x1f".join([
+        LLM_PROVIDER,
+        LLM_MODEL,
+        " ".join(jd_text.split()).casefold(),
+        " ".join(resume_text.split()).casefold()
+    ])
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
 
 async def analyze_role_fit(jd_text: str, resume_text: str) -> RoleFitAnalysis:
-    """AI-powered role fit analysis"""
-    try:
-        chat = LlmChat(
-            api_key=EMERGENT_KEY,
-            session_id=f"fit_analysis_{uuid.uuid4()}",
-            system_message="You are an expert HR analyst. Analyze the candidate's fit for the role."
-        ).with_model("openai", "gpt-5.2")
+    """AI-powered role fit analysis, memoized per JD/resume pair"""
+    key = role_fit_cache_key(jd_text, resume_text)
+    cached = await role_fit_cache.get(key)
+    if cached is not None:
+        return RoleFitAnalysis(**cached)
+    return await role_fit_flights.do(key, lambda: _analyze_and_cache_role_fit(key, jd_text, resume_text))
+
+async def _analyze_and_cache_role_fit(key: str, jd_text: str, resume_text: str) -> RoleFitAnalysis:
+    analysis, parsed = await _llm_role_fit(jd_text, resume_text)
+    # Fallbacks are not cached so the next request retries the LLM
+    if parsed:
+        await role_fit_cache.set(key, analysis.model_dump())
+    return analysis
 
+async def _llm_role_fit(jd_text: str, resume_text: str) -> Tuple[RoleFitAnalysis, bool]:
+    """Ask the LLM for a role fit analysis; the flag is False for fallback results"""
+    try:
         prompt = f"""Analyze the candidate's fit for this role.
 
 Job Description:
@@ -160,33 +331,649 @@ Provide analysis in JSON format:
 }}
 """
         
-        message = UserMessage(text=prompt)
-        response = await chat.send_message(message)
+        response = await llm.complete(
+            session_id=f"fit_analysis_{uuid.uuid4()}",
+            system_message="You are an expert HR analyst. Analyze the candidate's fit for the role.",
+            prompt=prompt,
+            priority=PRIORITY_ROLE_FIT,
+            call_site="role_fit"
+        )
         
-        # Parse JSON from response
-        import re
-        json_match = re.search(r'\{[^}]+\}', response, re.DOTALL)
-        if json_match:
-            analysis_data = json.loads(json_match.group())
-            return RoleFitAnalysis(**analysis_data)
+        analysis_data = await parse_llm_json(response, RoleFitAnalysis, "role_fit", PRIORITY_ROLE_FIT)
+        if analysis_data is not None:
+            return RoleFitAnalysis(**analysis_data), True
         else:
             # Fallback
+            score = prescreen_score(jd_text, resume_text)
             return RoleFitAnalysis(
-                skill_match_level="medium",
+                skill_match_level=match_level(score),
                 experience_relevance="Unable to analyze",
                 project_alignment="Unable to analyze",
                 analysis_summary=response[:500],
-                match_score=50
-            )
+                match_score=score
+            ), False
     except Exception as e:
         logging.error(f"Error in role fit analysis: {e}")
-        return RoleFitAnalysis(
-            skill_match_level="medium",
-            experience_relevance="Analysis pending",
-            project_alignment="Analysis pending",
-            analysis_summary="Automated analysis unavailable",
-            match_score=50
+        return prescreen_role_fit(prescreen_score(jd_text, resume_text), "Automated analysis unavailable"), False
+
+def prescreen_role_fit(score: int, reason: str) -> RoleFitAnalysis:
+    """Role fit from the keyword pre-screen alone"""
+    return RoleFitAnalysis(
+        skill_match_level=match_level(score),
+        experience_relevance="Analysis pending",
+        project_alignment="Analysis pending",
+        analysis_summary=f"{reason}; match score is from keyword pre-screening",
+        match_score=score
+    )
+
+async def run_role_fit_job(payload: Dict[str, Any]):
+    # Errors propagate so the queue retries them
+    analysis = await analyze_role_fit(payload["jd_text"], payload["resume_text"])
+    await db.interviews.update_one(
+        {"id": payload["interview_id"]},
+        {"$set": {
+            "role_fit_status": "completed",
+            "role_fit_analysis": analysis.model_dump()
+        }}
+    )
+
+async def fail_role_fit_job(payload: Dict[str, Any], error: str):
+    logging.error(f"Role fit job failed for {payload['interview_id']}: {error}")
+    await db.interviews.update_one(
+        {"id": payload["interview_id"]},
+        {"$set": {"role_fit_status": "failed", "role_fit_analysis": None}}
+    )
+
+def role_fit_job(interview_id: str, jd_text: str, resume_text: str) -> Tuple[str, Dict[str, Any]]:
+    return interview_id, {"interview_id": interview_id, "jd_text": jd_text, "resume_text": resume_text}
+
+async def schedule_role_fit_jobs(*jobs: Tuple[str, Dict[str, Any]]):
+    """Queue analyses durably; a restart or crashed worker doesn't strand them as pending"""
+    await role_fit_queue.enqueue_many(ROLE_FIT_JOB, list(jobs))
+
+async def get_role_fit_state(interview_id: str) -> Dict[str, Any]:
+    interview = await db.interviews.find_one(
+        {"id": interview_id},
+        {"_id": 0, "role_fit_status": 1, "role_fit_analysis": 1, "prescreen_score": 1}
+    )
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    analysis = interview.get('role_fit_analysis')
+    # Interviews created before background analysis have no status field
+    status = interview.get('role_fit_status') or ("completed" if analysis else "unavailable")
+    return {
+        "status": status,
+        "role_fit_analysis": analysis,
+        "prescreen_score": interview.get('prescreen_score')
+    }
+
+def encode_interview_cursor(interview: Dict[str, Any]) -> str:
+    raw = json.dumps([interview['created_at'], interview['id']]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_interview_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, interview_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(created_at), str(interview_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+SCORE_DIMENSIONS = {
+    "role_fit": ["skill_alignment", "experience_relevance", "project_applicability"],
+    "performance": ["communication_clarity", "depth_of_understanding", "consistency_with_resume"],
+}
+
+async def score_answer(interview_id: str, turn: int, question: str, answer: str,
+                       jd_text: str, resume_text: str):
+    """Score one answer and push it onto the interview's answer_scores"""
+    prompt = f"""Score this single interview answer.
+
+Role: {jd_text[:2000]}
+Candidate Resume: {resume_text[:2000]}
+
+Question: {question}
+Answer: {answer}
+
+Return ONLY valid JSON:
+{{
+    "skill_alignment": <number 0-100>,
+    "experience_relevance": <number 0-100>,
+    "project_applicability": <number 0-100>,
+    "communication_clarity": <number 0-100>,
+    "depth_of_understanding": <number 0-100>,
+    "consistency_with_resume": <number 0-100>,
+    "note": "one sentence on what this answer showed"
+}}
+"""
+    # Once the evaluation is saved nothing reads further scores
+    if not await db.interviews.find_one({"id": interview_id, "evaluation": None}, {"_id": 1}):
+        return
+    scores = None
+    note = ""
+    # Scored at evaluation priority, so the LLM scheduler serves live turns first
+    try:
+        response = await llm.complete(
+            session_id=f"answer_score_{interview_id}_{turn}",
+            system_message="You are an expert interviewer scoring a single candidate answer.",
+            prompt=prompt,
+            priority=PRIORITY_EVALUATION,
+            call_site="answer_score"
+        )
+        data = await parse_llm_json(response, AnswerScore, "answer_score", PRIORITY_EVALUATION)
+        if data is not None:
+            scores = {
+                dimension: max(0, min(100, int(data.get(dimension, 0))))
+                for dimensions in SCORE_DIMENSIONS.values()
+                for dimension in dimensions
+            }
+            note = str(data.get("note", ""))[:500]
+    except Exception as e:
+        logging.error(f"Answer scoring failed for {interview_id} turn {turn}: {e}")
+
+    # Unscored answers are kept so the summary still sees the transcript
+    entry = {
+        "turn": turn,
+        "question": question,
+        "answer": answer,
+        "scores": scores,
+        "note": note
+    }
+    await db.interviews.update_one(
+        {"id": interview_id, "evaluation": None},
+        {"$push": {"answer_scores": entry}}
+    )
+
+def schedule_answer_scoring(interview_id: str, turn: int, question: str, answer: str,
+                            jd_text: str, resume_text: str) -> asyncio.Task:
+    task = asyncio.create_task(
+        score_answer(interview_id, turn, question, answer, jd_text, resume_text)
+    )
+    answer_scoring_tasks.add(task)
+    task.add_done_callback(answer_scoring_tasks.discard)
+    return task
+
+def aggregate_answer_scores(answer_scores: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Average the per-answer scores into the evaluation's score sections"""
+    scored = [entry["scores"] for entry in answer_scores if entry.get("scores")]
+    aggregate: Dict[str, Any] = {}
+    all_values = []
+    for section, dimensions in SCORE_DIMENSIONS.items():
+        aggregate[section] = {}
+        for dimension in dimensions:
+            values = [scores.get(dimension, 0) for scores in scored]
+            aggregate[section][dimension] = round(sum(values) / len(values)) if values else 0
+            all_values.extend(values)
+    aggregate["overall_score"] = round(sum(all_values) / len(all_values)) if all_values else 0
+    return aggregate
+
+def unscored_answers(context: "InterviewContext") -> List[Dict[str, Any]]:
+    """Recorded answers whose score never landed, e.g. once the scoring wait ran out"""
+    scored_turns = {entry.get("turn") for entry in context.answer_scores}
+    conversation = context.conversation
+    # conversation is the greeting exchange, then one answer/reply pair per turn
+    return [
+        {
+            "turn": turn,
+            "question": conversation[2 * turn - 1]["content"],
+            "answer": conversation[2 * turn]["content"],
+            "scores": None,
+            "note": ""
+        }
+        for turn in range(1, len(conversation) // 2)
+        if turn not in scored_turns
+    ]
+
+async def summarize_scored_interview(interview_id: str, answer_scores: List[Dict[str, Any]],
+                                     flag_count: int) -> Dict[str, Any]:
+    """Build the evaluation from precomputed scores plus one short summary call"""
+    # Scoring tasks finish out of order
+    answer_scores = sorted(answer_scores, key=lambda entry: entry.get("turn", 0))
+    evaluation_data = aggregate_answer_scores(answer_scores)
+    overall = evaluation_data["overall_score"]
+    if overall >= 75:
+        evaluation_data["recommendation"] = "Strong fit"
+    elif overall >= 50:
+        evaluation_data["recommendation"] = "Moderate fit"
+    else:
+        evaluation_data["recommendation"] = "Weak fit"
+
+    notes = "\n".join(
+        f"- Turn {entry['turn']}{'' if entry.get('scores') else ' (not scored)'}: "
+        f"{entry.get('note') or entry['answer'][:200]}"
+        for entry in answer_scores
+    )
+    prompt = f"""Summarize this interview from per-answer notes.
+
+Overall score: {overall}/100
+Integrity Flags: {flag_count}
+
+Per-answer notes:
+{notes}
+
+Return ONLY valid JSON:
+{{
+    "behavioral_observations": {{
+        "confidence_indicators": "High/Medium/Low",
+        "nervousness_patterns": "description",
+        "responsiveness": "description"
+    }},
+    "strengths": ["strength1", "strength2", "strength3"],
+    "weaknesses": ["weakness1", "weakness2"]
+}}
+"""
+    try:
+        summary_text = await llm.complete(
+            session_id=f"evaluation_summary_{interview_id}",
+            system_message="You are an expert interviewer writing a concise evaluation summary.",
+            prompt=prompt,
+            priority=PRIORITY_EVALUATION,
+            call_site="evaluation"
+        )
+        summary = await parse_llm_json(
+            summary_text, EvaluationSummary, "evaluation_summary", PRIORITY_EVALUATION
+        ) or {}
+    except Exception as e:
+        logging.error(f"Evaluation summary failed for {interview_id}: {e}")
+        summary = {}
+
+    evaluation_data["behavioral_observations"] = summary.get("behavioral_observations", {
+        "confidence_indicators": "Not assessed",
+        "nervousness_patterns": "Summary unavailable",
+        "responsiveness": f"{len(answer_scores)} answers scored"
+    })
+    evaluation_data["strengths"] = summary.get("strengths", [])
+    evaluation_data["weaknesses"] = summary.get("weaknesses", [])
+    return evaluation_data
+
+async def _extract_profile_data(session_id: str, prompt: str) -> Dict[str, Any]:
+    try:
+        response = await llm.complete(
+            session_id=session_id,
+            system_message="You extract structured data from hiring documents.",
+            prompt=prompt,
+            priority=PRIORITY_ROLE_FIT,
+            call_site="profile"
         )
+        return parse_extraction(response)
+    except Exception as e:
+        logging.error(f"Profile extraction failed for {session_id}: {e}")
+        return {}
+
+async def extract_jd_profile(jd: JobDescription):
+    """Fill required_skills and the prompt profile; runs once per JD"""
+    data = {}
+    if jd.role_expectations.strip():
+        data = await _extract_profile_data(f"jd_profile_{jd.id}", jd_extraction_prompt(jd.role_expectations))
+    await db.job_descriptions.update_one(
+        {"id": jd.id},
+        {"$set": {
+            "required_skills": clean_list(data.get("required_skills"), MAX_SKILLS),
+            "profile": build_jd_profile(jd.title, data, jd.role_expectations)
+        }}
+    )
+
+async def extract_resume_profile(resume: CandidateResume, semaphore: Optional[asyncio.Semaphore] = None):
+    """Fill skills, projects and the prompt profile; runs once per resume"""
+    data = {}
+    if resume.experience.strip():
+        prompt = resume_extraction_prompt(resume.experience)
+        if semaphore is not None:
+            async with semaphore:
+                data = await _extract_profile_data(f"resume_profile_{resume.id}", prompt)
+        else:
+            data = await _extract_profile_data(f"resume_profile_{resume.id}", prompt)
+    skills = clean_list(data.get("skills"), MAX_SKILLS)
+    await db.candidate_resumes.update_one(
+        {"id": resume.id},
+        {"$set": {
+            "skills": skills,
+            "projects": clean_list(data.get("projects"), MAX_PROJECTS),
+            "profile": build_resume_profile(resume.name, data, resume.experience)
+        }}
+    )
+    # Setup leaves indexing to this step, so each resume is indexed once with its skills
+    await resume_index.add(resume.id, resume.experience, skills)
+
+def schedule_profiles(*jobs) -> asyncio.Future:
+    future = asyncio.gather(*jobs, return_exceptions=True)
+    profile_jobs.add(future)
+    future.add_done_callback(profile_jobs.discard)
+    return future
+
+# Interview fields, plus the JD/resume fields the prompts use, for a live session
+INTERVIEW_CONTEXT_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "conversation": 1,
+    "questions_asked": 1,
+    "integrity_flags": 1,
+    "answer_scores": 1,
+    "jd.title": 1,
+    "jd.role_expectations": 1,
+    "jd.profile": 1,
+    "resume.experience": 1,
+    "resume.profile": 1
+}
+
+class InterviewContext:
+    """One read of the interview fields a session or evaluation needs"""
+
+    def __init__(self, doc: Dict[str, Any]):
+        self.interview_id = doc['id']
+        self.jd = (doc.get('jd') or [{}])[0]
+        self.resume = (doc.get('resume') or [{}])[0]
+        self.job_title: str = self.jd.get('title', '')
+        self.conversation: List[Dict[str, str]] = doc.get('conversation', [])
+        self.questions_asked: List[str] = doc.get('questions_asked', [])
+        self.integrity_flags: List[Dict[str, Any]] = doc.get('integrity_flags', [])
+        self.answer_scores: List[Dict[str, Any]] = doc.get('answer_scores', [])
+
+async def load_interview_context(interview_id: str) -> Optional[InterviewContext]:
+    """Interview, JD and resume in one round trip"""
+    docs = await db.interviews.aggregate([
+        {"$match": {"id": interview_id}},
+        {"$limit": 1},
+        {"$lookup": {
+            "from": "job_descriptions",
+            "localField": "job_description_id",
+            "foreignField": "id",
+            "as": "jd"
+        }},
+        {"$lookup": {
+            "from": "candidate_resumes",
+            "localField": "candidate_resume_id",
+            "foreignField": "id",
+            "as": "resume"
+        }},
+        {"$project": INTERVIEW_CONTEXT_PROJECTION}
+    ]).to_list(1)
+    return InterviewContext(docs[0]) if docs else None
+
+GREETING_PROMPT = "Start the interview with a brief introduction and first question."
+
+def interview_system_message(jd: Dict[str, Any], resume: Dict[str, Any]) -> str:
+    return f"""You are a professional AI interviewer conducting a 25-minute video interview.
+
+Job Description: {jd.get('profile') or truncate_to_budget(jd.get('role_expectations', ''))}
+Candidate Info: {resume.get('profile') or truncate_to_budget(resume.get('experience', ''))}
+
+Rules:
+1. Ask ONE clear question at a time
+2. Wait for response before next question
+3. Probe deeper on vague answers
+4. Stay professional and focused
+5. Generate contextual follow-ups
+6. Do NOT reveal your scoring logic
+7. Keep responses brief and interviewer-like
+8. Track time internally (25 min total)
+"""
+
+async def store_greeting(interview_id: str, greeting: str) -> bool:
+    """Record the opening exchange unless one is already stored"""
+    result = await db.interviews.update_one(
+        {"id": interview_id, "conversation.0": {"$exists": False}},
+        {"$push": {
+            "questions_asked": greeting,
+            "conversation": {"$each": [
+                {"role": "user", "content": GREETING_PROMPT},
+                {"role": "assistant", "content": greeting}
+            ]}
+        }}
+    )
+    return result.modified_count == 1
+
+async def pregenerate_greeting(interview_id: str, priority: str,
+                               after: Optional[asyncio.Future] = None) -> bool:
+    try:
+        if after is not None:
+            # Wait for the profiles the system message is built from
+            await asyncio.shield(after)
+        context = await load_interview_context(interview_id)
+        if not context or context.conversation:
+            return bool(context)
+        greeting = await llm.complete(
+            session_id=interview_id,
+            system_message=interview_system_message(context.jd, context.resume),
+            prompt=GREETING_PROMPT,
+            priority=priority,
+            call_site="greeting"
+        )
+        await store_greeting(interview_id, greeting)
+        return True
+    except Exception as e:
+        logging.error(f"Greeting pre-generation failed for {interview_id}: {e}")
+        return False
+
+def schedule_greeting(interview_id: str, priority: str, after: Optional[asyncio.Future] = None):
+    if interview_id in greeting_jobs:
+        return
+    task = asyncio.create_task(pregenerate_greeting(interview_id, priority, after))
+    greeting_jobs[interview_id] = task
+    task.add_done_callback(lambda _: greeting_jobs.pop(interview_id, None))
+
+async def wait_for_greeting(interview_id: str) -> bool:
+    """True once a pre-generated greeting is stored; a slow one is cancelled so
+    the live path doesn't race it"""
+    task = greeting_jobs.get(interview_id)
+    if task is None:
+        return False
+    done, _ = await asyncio.wait({task}, timeout=GREETING_PREGEN_WAIT_SECONDS)
+    if not done:
+        task.cancel()
+        return False
+    # Another socket waiting on the same task may have cancelled it
+    return not task.cancelled() and task.result()
+
+async def record_turn(interview_id: str, prompt: str, reply: str):
+    """Persist one exchange so a reconnect can resume the session from Mongo"""
+    await db.interviews.update_one(
+        {"id": interview_id},
+        {"$push": {
+            "questions_asked": reply,
+            "conversation": {"$each": [
+                {"role": "user", "content": prompt},
+                {"role": "assistant", "content": reply}
+            ]}
+        }}
+    )
+
+async def send_ai_reply(interview_id: str, session: LLMSession, text: str, stream: bool = False,
+                        call_site: str = "turn") -> str:
+    """Send the AI reply over the interview socket and return the full text"""
+    # Chats that can't stream send one whole ai_message, not a single delta
+    if not stream or not session.streams:
+        reply = await session.send(text, call_site=call_site)
+        await manager.send_message(interview_id, {
+            "type": "ai_message",
+            "content": reply
+        })
+        return reply
+
+    message_id = str(uuid.uuid4())
+    parts = []
+    async for chunk in session.stream(text, call_site=call_site):
+        if not chunk:
+            continue
+        parts.append(chunk)
+        await manager.send_message(interview_id, {
+            "type": "ai_message_delta",
+            "message_id": message_id,
+            "content": chunk
+        })
+    reply = "".join(parts)
+    await manager.send_message(interview_id, {
+        "type": "ai_message_done",
+        "message_id": message_id,
+        "content": reply
+    })
+    return reply
+
+def no_response_evaluation(integrity_flags: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "overall_score": 0,
+        "recommendation": "Cannot Evaluate - No Responses",
+        "role_fit": {
+            "skill_alignment": 0,
+            "experience_relevance": 0,
+            "project_applicability": 0
+        },
+        "performance": {
+            "communication_clarity": 0,
+            "depth_of_understanding": 0,
+            "consistency_with_resume": 0
+        },
+        "behavioral_observations": {
+            "confidence_indicators": "Not assessed",
+            "nervousness_patterns": "Candidate did not respond to any questions",
+            "responsiveness": "No responses provided"
+        },
+        "integrity_score": {
+            "score": 0,
+            "suspicious_moments": integrity_flags
+        },
+        "strengths": ["Unable to assess - no interview responses captured"],
+        "weaknesses": ["Did not participate in interview", "No responses provided to any questions"],
+        "integrity_flags": integrity_flags
+    }
+
+async def build_evaluation(context: InterviewContext) -> Dict[str, Any]:
+    """Evaluation report for a finished interview"""
+    interview_id = context.interview_id
+    questions_asked = context.questions_asked
+    integrity_flags = context.integrity_flags
+
+    # Check if candidate actually responded (need at least 2 exchanges - greeting + 1 response)
+    if len(questions_asked) <= 1:
+        return no_response_evaluation(integrity_flags)
+
+    if any(entry.get('scores') for entry in context.answer_scores):
+        # Scores were computed turn by turn; only a short summary remains
+        missing = unscored_answers(context)
+        evaluation_data = await summarize_scored_interview(
+            interview_id,
+            context.answer_scores + missing,
+            len(integrity_flags)
+        )
+        if missing:
+            # The averages only cover the answers that were scored
+            evaluation_data["partial"] = True
+            evaluation_data["unscored_answers"] = len(missing)
+    else:
+        eval_prompt = f"""Based on this interview, generate a comprehensive evaluation report in JSON format.
+
+Interview Details:
+- Questions Asked: {len(questions_asked)}
+- Integrity Flags: {len(integrity_flags)}
+
+Conversation History:
+{chr(10).join(questions_asked[:10])}
+
+Generate evaluation in this EXACT JSON format:
+{{
+    "overall_score": <number 0-100>,
+    "recommendation": "Strong fit / Moderate fit / Weak fit",
+    "role_fit": {{
+        "skill_alignment": <number 0-100>,
+        "experience_relevance": <number 0-100>,
+        "project_applicability": <number 0-100>
+    }},
+    "performance": {{
+        "communication_clarity": <number 0-100>,
+        "depth_of_understanding": <number 0-100>,
+        "consistency_with_resume": <number 0-100>
+    }},
+    "behavioral_observations": {{
+        "confidence_indicators": "High/Medium/Low",
+        "nervousness_patterns": "description",
+        "responsiveness": "description"
+    }},
+    "integrity_score": {{
+        "score": <number 0-100>,
+        "suspicious_moments": []
+    }},
+    "strengths": ["strength1", "strength2", "strength3"],
+    "weaknesses": ["weakness1", "weakness2"]
+}}
+
+Consider integrity flags in scoring. Return ONLY valid JSON.
+"""
+
+        # The interview's own history, so the model sees the whole conversation
+        chat = llm.session(
+            session_id=interview_id,
+            history=context.conversation,
+            system_message=interview_system_message(context.jd, context.resume)
+        )
+        evaluation_text = await chat.send(
+            eval_prompt,
+            priority=PRIORITY_EVALUATION,
+            call_site="evaluation"
+        )
+
+        # Integrity fields are filled in below, not by the model
+        evaluation_data = await parse_llm_json(
+            evaluation_text,
+            EvaluationReport,
+            "evaluation",
+            PRIORITY_EVALUATION,
+            defaults={"interview_id": interview_id, "integrity_score": {}}
+        )
+        if evaluation_data is None:
+            # Fallback evaluation
+            evaluation_data = {
+                "overall_score": 50,
+                "recommendation": "Moderate fit",
+                "raw_text": evaluation_text
+            }
+
+    # Add integrity flags to evaluation
+    evaluation_data['integrity_flags'] = integrity_flags
+
+    # Calculate integrity score based on flags
+    integrity_score = max(0, 100 - (len(integrity_flags) * 15))  # -15 points per flag
+    evaluation_data['integrity_score'] = {
+        "score": integrity_score,
+        "suspicious_moments": integrity_flags
+    }
+    return evaluation_data
+
+async def run_evaluation_job(payload: Dict[str, Any]):
+    interview_id = payload["interview_id"]
+    if await db.interviews.find_one({"id": interview_id, "evaluation": {"$ne": None}}, {"_id": 1}):
+        return
+    context = await load_interview_context(interview_id)
+    if context is None:
+        logging.warning(f"Evaluation requested for missing interview {interview_id}")
+        return
+    unscored = len(unscored_answers(context))
+    if unscored > 0:
+        # Scoring tasks may live on another worker, so progress is read from Mongo
+        requested_at = payload.get("requested_at")
+        waited = time.time() - requested_at if requested_at else ANSWER_SCORING_WAIT_SECONDS
+        if waited < ANSWER_SCORING_WAIT_SECONDS:
+            raise RetryLater(ANSWER_SCORING_RECHECK_SECONDS, f"{unscored} answers still being scored")
+        logging.warning(f"Evaluating {interview_id} without scores for {unscored} answers")
+    evaluation_data = await build_evaluation(context)
+    # Never replaces an evaluation already there, e.g. an integrity termination
+    # or a previous attempt that saved before losing its lease
+    result = await db.interviews.update_one(
+        {"id": interview_id, "evaluation": None},
+        {"$set": {"evaluation": evaluation_data}}
+    )
+    if result.modified_count:
+        await analytics.evaluation_saved(context.job_title, evaluation_data)
+
+async def request_evaluation(interview_id: str) -> Dict[str, Any]:
+    """Queue the evaluation once this worker's buffered flags have landed.
+
+    Answers still being scored are waited for by the job, not the caller.
+    """
+    await flag_buffer.flush(interview_id)
+    return await job_queue.enqueue(
+        EVALUATION_JOB,
+        interview_id,
+        {"interview_id": interview_id, "requested_at": time.time()}
+    )
 
 # Routes
 @api_router.get("/")
@@ -205,33 +992,18 @@ async def create_resume(resume: CandidateResume):
     doc = resume.model_dump()
     doc['created_at'] = doc['created_at'].isoformat()
     await db.candidate_resumes.insert_one(doc)
+    await resume_index.add(resume.id, resume.experience, resume.skills)
     return resume
 
 @api_router.post("/upload/resume")
 async def upload_resume(file: UploadFile = File(...)):
-    content = await file.read()
-    
-    if file.filename.endswith('.pdf'):
-        text = extract_text_from_pdf(content)
-    elif file.filename.endswith('.docx'):
-        text = extract_text_from_docx(content)
-    else:
-        raise HTTPException(status_code=400, detail="Only PDF and DOCX files supported")
-    
-    return {"text": text, "filename": file.filename}
+    parsed = await extract_upload_text(file, "resume")
+    return {**parsed, "filename": file.filename}
 
 @api_router.post("/upload/job-description")
 async def upload_jd(file: UploadFile = File(...)):
-    content = await file.read()
-    
-    if file.filename.endswith('.pdf'):
-        text = extract_text_from_pdf(content)
-    elif file.filename.endswith('.docx'):
-        text = extract_text_from_docx(content)
-    else:
-        raise HTTPException(status_code=400, detail="Only PDF and DOCX files supported")
-    
-    return {"text": text, "filename": file.filename}
+    parsed = await extract_upload_text(file, "job_description")
+    return {**parsed, "filename": file.filename}
 
 @api_router.post("/interview/setup")
 async def setup_interview(request: InterviewSetupRequest):
@@ -258,29 +1030,172 @@ async def setup_interview(request: InterviewSetupRequest):
     resume_doc['created_at'] = resume_doc['created_at'].isoformat()
     await db.candidate_resumes.insert_one(resume_doc)
     
-    # Create Interview
+    # Create Interview, with an instant keyword score while the LLM analysis runs
     interview = Interview(
         job_description_id=jd.id,
         candidate_resume_id=resume.id,
-        status="scheduled"
+        status="scheduled",
+        prescreen_score=prescreen_score(request.jd_text or request.job_title, request.resume_text or "")
     )
     interview_doc = interview.model_dump()
     interview_doc['created_at'] = interview_doc['created_at'].isoformat()
     await db.interviews.insert_one(interview_doc)
+    await analytics.status_changed(None, interview.status)
     
-    # Analyze fit
-    analysis = await analyze_role_fit(
+    # Extract compact profiles once, then have the opening question ready
+    # before the candidate joins
+    profiles = schedule_profiles(extract_jd_profile(jd), extract_resume_profile(resume))
+    schedule_greeting(interview.id, PRIORITY_ROLE_FIT, after=profiles)
+    
+    # Analyze fit in the background; clients poll /role-fit for the result
+    await schedule_role_fit_jobs(role_fit_job(
+        interview.id,
         request.jd_text or request.job_title,
         request.resume_text or f"Candidate: {request.candidate_name}"
-    )
+    ))
     
     return {
         "interview_id": interview.id,
         "job_description": jd,
         "candidate_resume": resume,
-        "role_fit_analysis": analysis
+        "role_fit_status": "pending",
+        "role_fit_analysis": None,
+        "prescreen_score": interview.prescreen_score
     }
 
+@api_router.post("/interviews/bulk-setup")
+async def bulk_setup_interviews(request: BulkInterviewSetupRequest):
+    """Set up one JD against many candidates.
+
+    Every candidate gets a keyword pre-screen score at once; only the top
+    `llm_top_k` by that score get the LLM analysis, the rest are settled as
+    `prescreened`. Streams NDJSON: a `created` line with every interview id,
+    then one `role_fit` line per candidate, pre-screened ones first and the
+    rest as their analysis finishes.
+    """
+    if not request.candidates:
+        raise HTTPException(status_code=400, detail="At least one candidate is required")
+    if len(request.candidates) > BULK_SETUP_MAX_CANDIDATES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BULK_SETUP_MAX_CANDIDATES} candidates per request"
+        )
+    top_k = request.llm_top_k if request.llm_top_k is not None else BULK_ROLE_FIT_TOP_K
+    if top_k < 0:
+        raise HTTPException(status_code=400, detail="llm_top_k must not be negative")
+
+    # Create JD once for the whole batch
+    jd = JobDescription(
+        title=request.job_title,
+        required_skills=[],
+        preferred_experience=request.jd_text or "",
+        role_expectations=request.jd_text or ""
+    )
+    jd_doc = jd.model_dump()
+    jd_doc['created_at'] = jd_doc['created_at'].isoformat()
+    await db.job_descriptions.insert_one(jd_doc)
+
+    resumes = [
+        CandidateResume(
+            name=candidate.candidate_name,
+            email=candidate.candidate_email,
+            skills=[],
+            experience=candidate.resume_text or "",
+            projects=[]
+        )
+        for candidate in request.candidates
+    ]
+    # One batched keyword pass ranks the whole batch before any LLM call
+    jd_text = request.jd_text or request.job_title
+    scores = await asyncio.to_thread(
+        prescreen_scores, jd_text, [candidate.resume_text or "" for candidate in request.candidates]
+    )
+    ranked = sorted(range(len(scores)), key=lambda index: scores[index], reverse=True)
+    llm_indexes = set(ranked[:top_k]) if top_k else set(ranked)
+    interviews = []
+    for index, (resume, score) in enumerate(zip(resumes, scores)):
+        interview = Interview(
+            job_description_id=jd.id,
+            candidate_resume_id=resume.id,
+            status="scheduled",
+            prescreen_score=score
+        )
+        if index not in llm_indexes:
+            interview.role_fit_status = "prescreened"
+            interview.role_fit_analysis = prescreen_role_fit(
+                score, f"Not in the top {top_k} candidates sent for LLM analysis"
+            ).model_dump()
+        interviews.append(interview)
+    resume_docs = [resume.model_dump() for resume in resumes]
+    interview_docs = [interview.model_dump() for interview in interviews]
+    for doc in resume_docs + interview_docs:
+        doc['created_at'] = doc['created_at'].isoformat()
+    await db.candidate_resumes.insert_many(resume_docs)
+    await db.interviews.insert_many(interview_docs)
+    await analytics.status_changed(None, "scheduled", len(interview_docs))
+
+    # Queued like single setups, so they finish even if the client disconnects
+    semaphore = asyncio.Semaphore(BULK_ROLE_FIT_CONCURRENCY)
+    schedule_profiles(
+        extract_jd_profile(jd),
+        *(extract_resume_profile(resume, semaphore) for resume in resumes)
+    )
+    pending = {
+        interviews[index].id: (request.candidates[index], interviews[index])
+        for index in ranked if index in llm_indexes
+    }
+    await schedule_role_fit_jobs(*(
+        role_fit_job(
+            interview.id,
+            jd_text,
+            candidate.resume_text or f"Candidate: {candidate.candidate_name}"
+        )
+        for candidate, interview in pending.values()
+    ))
+
+    def role_fit_line(candidate: BulkCandidate, interview: Interview, state: Dict[str, Any]) -> str:
+        return json.dumps({
+            "type": "role_fit",
+            "interview_id": interview.id,
+            "candidate_name": candidate.candidate_name,
+            "candidate_email": candidate.candidate_email,
+            "prescreen_score": interview.prescreen_score,
+            "role_fit_status": state["status"],
+            "role_fit_analysis": state["role_fit_analysis"]
+        }) + "\n"
+
+    async def results():
+        yield json.dumps({
+            "type": "created",
+            "job_description_id": jd.id,
+            "interviews": [
+                {"interview_id": interview.id, "candidate_email": candidate.candidate_email}
+                for candidate, interview in zip(request.candidates, interviews)
+            ]
+        }) + "\n"
+        for index in ranked:
+            if index not in llm_indexes:
+                yield role_fit_line(request.candidates[index], interviews[index], {
+                    "status": interviews[index].role_fit_status,
+                    "role_fit_analysis": interviews[index].role_fit_analysis
+                })
+        # Jobs may run on any worker, so results are read back from Mongo
+        while pending:
+            settled = await db.interviews.find(
+                {"id": {"$in": list(pending)}, "role_fit_status": {"$ne": "pending"}},
+                {"_id": 0, "id": 1, "role_fit_status": 1, "role_fit_analysis": 1}
+            ).to_list(None)
+            for doc in settled:
+                candidate, interview = pending.pop(doc["id"])
+                yield role_fit_line(candidate, interview, {
+                    "status": doc["role_fit_status"],
+                    "role_fit_analysis": doc.get("role_fit_analysis")
+                })
+            if pending:
+                await role_fit_queue.wait_settled(ROLE_FIT_POLL_SECONDS)
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
 @api_router.get("/interview/{interview_id}")
 async def get_interview(interview_id: str):
     interview = await db.interviews.find_one({"id": interview_id}, {"_id": 0})
@@ -288,31 +1203,88 @@ async def get_interview(interview_id: str):
         raise HTTPException(status_code=404, detail="Interview not found")
     return interview
 
+@api_router.get("/interview/{interview_id}/role-fit")
+async def get_role_fit(interview_id: str):
+    return await get_role_fit_state(interview_id)
+
+@api_router.get("/interview/{interview_id}/role-fit/stream")
+async def stream_role_fit(interview_id: str):
+    """Server-sent events: one role_fit event once the analysis settles"""
+    state = await get_role_fit_state(interview_id)
+
+    async def events():
+        nonlocal state
+        deadline = asyncio.get_running_loop().time() + ROLE_FIT_STREAM_TIMEOUT_SECONDS
+        while state["status"] == "pending" and asyncio.get_running_loop().time() < deadline:
+            # Wakes early when a local job settles; the job may be on another worker
+            await role_fit_queue.wait_settled(ROLE_FIT_POLL_SECONDS)
+            yield ": keep-alive\n\n"
+            state = await get_role_fit_state(interview_id)
+        yield f"event: role_fit\ndata: {json.dumps(state)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @api_router.post("/interview/{interview_id}/start")
 async def start_interview(interview_id: str):
-    result = await db.interviews.update_one(
+    previous = await db.interviews.find_one_and_update(
         {"id": interview_id},
         {"$set": {
             "status": "in_progress",
             "start_time": datetime.now(timezone.utc).isoformat()
-        }}
+        }},
+        projection={"_id": 0, "status": 1},
+        return_document=ReturnDocument.BEFORE
     )
-    if result.modified_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="Interview not found")
+    await analytics.status_changed(previous.get("status"), "in_progress")
+    # No-op when setup's pre-generation is already running or done
+    schedule_greeting(interview_id, PRIORITY_LIVE_TURN)
     return {"status": "started"}
 
 @api_router.post("/interview/{interview_id}/end")
 async def end_interview(interview_id: str):
-    result = await db.interviews.update_one(
-        {"id": interview_id},
+    # The client ends a terminated interview too; it stays terminated
+    previous = await db.interviews.find_one_and_update(
+        {"id": interview_id, "status": {"$ne": "terminated"}},
         {"$set": {
             "status": "completed",
             "end_time": datetime.now(timezone.utc).isoformat()
-        }}
+        }},
+        projection={"_id": 0, "status": 1},
+        return_document=ReturnDocument.BEFORE
     )
-    if result.modified_count == 0:
+    if previous is None:
+        if await db.interviews.find_one({"id": interview_id}, {"_id": 1}):
+            return {"status": "terminated", "evaluation_job_id": None}
         raise HTTPException(status_code=404, detail="Interview not found")
-    return {"status": "completed"}
+    await analytics.status_changed(previous.get("status"), "completed")
+    # Usually already queued by the socket; covers sockets that dropped first
+    job = await request_evaluation(interview_id)
+    return {"status": "completed", "evaluation_job_id": job["id"]}
+
+@api_router.get("/interview/{interview_id}/evaluation")
+async def get_evaluation(interview_id: str):
+    interview = await db.interviews.find_one({"id": interview_id}, {"_id": 0, "evaluation": 1})
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    job = await job_queue.get(EVALUATION_JOB, interview_id)
+    job_id = job["id"] if job else None
+    if interview.get("evaluation"):
+        return {"status": "ready", "job_id": job_id, "evaluation": interview["evaluation"]}
+    if job is None:
+        return {"status": "not_requested", "job_id": None, "evaluation": None}
+    return {
+        "status": {"queued": "pending", "running": "running"}.get(job["status"], "failed"),
+        "job_id": job_id,
+        "attempts": job["attempts"],
+        "error": job.get("last_error") if job["status"] == "failed" else None,
+        "evaluation": None
+    }
 
 @api_router.post("/interview/{interview_id}/integrity-flag")
 async def add_integrity_flag(interview_id: str, flag: IntegrityFlag):
@@ -321,70 +1293,152 @@ async def add_integrity_flag(interview_id: str, flag: IntegrityFlag):
         "flag_type": flag.flag_type,
         "description": flag.description
     }
-    result = await db.interviews.update_one(
-        {"id": interview_id},
-        {"$push": {"integrity_flags": flag_dict}}
-    )
-    if result.modified_count == 0:
+    interview = await db.interviews.find_one({"id": interview_id}, {"_id": 1})
+    if not interview:
         raise HTTPException(status_code=404, detail="Interview not found")
+    if not await flag_buffer.add(interview_id, flag_dict):
+        return {"status": "flag_duplicate"}
     return {"status": "flag_added"}
 
+@api_router.get("/candidates/search")
+async def search_candidates(
+    jd_id: str,
+    limit: int = Query(RESUME_SEARCH_LIMIT, ge=1, le=RESUME_SEARCH_MAX_LIMIT)
+):
+    """Stored candidates ranked by keyword match against a job description"""
+    jd = await db.job_descriptions.find_one(
+        {"id": jd_id},
+        {"_id": 0, "title": 1, "role_expectations": 1, "required_skills": 1}
+    )
+    if not jd:
+        raise HTTPException(status_code=404, detail="Job description not found")
+
+    await resume_index.refresh()
+    matches = resume_index.search(
+        jd.get('role_expectations') or jd.get('title', ''),
+        jd.get('required_skills', []),
+        limit
+    )
+    resumes = {}
+    async for resume in db.candidate_resumes.find(
+        {"id": {"$in": [resume_id for resume_id, _ in matches]}},
+        {"_id": 0, "id": 1, "name": 1, "email": 1, "skills": 1}
+    ):
+        resumes[resume["id"]] = resume
+    return {
+        "job_description_id": jd_id,
+        "indexed_resumes": len(resume_index),
+        "matches": [
+            {**resumes[resume_id], "match_score": score}
+            for resume_id, score in matches
+            if resume_id in resumes
+        ]
+    }
+
 @api_router.get("/interviews")
-async def get_interviews():
-    interviews = await db.interviews.find({}, {"_id": 0}).sort("created_at", -1).to_list(100)
+async def get_interviews(
+    response: Response,
+    limit: int = Query(INTERVIEW_PAGE_SIZE, ge=1, le=INTERVIEW_MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    status: Optional[str] = None
+):
+    """Newest interviews first, keyset paginated.
+
+    `after` takes the X-Next-Cursor header of the previous page, `fields`
+    and `status` are comma separated.
+    """
+    query: Dict[str, Any] = {}
+    if status:
+        query["status"] = {"$in": [value.strip() for value in status.split(",") if value.strip()]}
+    if after:
+        created_at, last_id = decode_interview_cursor(after)
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": last_id}}
+        ]
+
+    projection: Dict[str, int] = {"_id": 0}
+    if fields:
+        requested = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = requested - set(Interview.model_fields)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        # The cursor is built from created_at and id
+        projection.update({field: 1 for field in requested | {"id", "created_at"}})
+
+    interviews = await db.interviews.find(query, projection).sort(
+        [("created_at", -1), ("id", -1)]
+    ).limit(limit).to_list(limit)
+
+    if len(interviews) == limit:
+        response.headers["X-Next-Cursor"] = encode_interview_cursor(interviews[-1])
     return interviews
 
+@api_router.get("/analytics")
+async def get_analytics(job_title_limit: int = Query(ANALYTICS_JOB_TITLE_LIMIT, ge=1, le=1000)):
+    """Dashboard aggregates, read from rollups instead of scanning interviews"""
+    return await analytics.summary(job_title_limit)
+
+@api_router.get("/admin/llm-scheduler")
+async def get_llm_scheduler_stats():
+    return llm.scheduler.snapshot()
+
+@api_router.get("/admin/indexes")
+async def get_index_usage():
+    return await index_usage(db)
+
 # WebSocket for real-time interview
 @api_router.websocket("/interview/{interview_id}/ws")
 async def interview_websocket(websocket: WebSocket, interview_id: str):
     await manager.connect(interview_id, websocket)
-    
-    # Get interview data
-    interview = await db.interviews.find_one({"id": interview_id}, {"_id": 0})
-    if not interview:
-        await websocket.close()
-        return
-    
-    jd = await db.job_descriptions.find_one({"id": interview['job_description_id']}, {"_id": 0})
-    resume = await db.candidate_resumes.find_one({"id": interview['candidate_resume_id']}, {"_id": 0})
-    
-    # Initialize AI interviewer
-    chat = LlmChat(
-        api_key=EMERGENT_KEY,
-        session_id=interview_id,
-        system_message=f"""You are a professional AI interviewer conducting a 25-minute video interview.
-
-Job Description: {jd.get('role_expectations', '')}
-Candidate Info: {resume.get('experience', '')}
-
-Rules:
-1. Ask ONE clear question at a time
-2. Wait for response before next question
-3. Probe deeper on vague answers
-4. Stay professional and focused
-5. Generate contextual follow-ups
-6. Do NOT reveal your scoring logic
-7. Keep responses brief and interviewer-like
-8. Track time internally (25 min total)
-"""
-    ).with_model("openai", "gpt-5.2")
+    # Clients opt in to token streaming with ?stream=1
+    stream = websocket.query_params.get("stream", "").lower() in ("1", "true", "yes")
     
     try:
-        # Send initial greeting
-        greeting = await chat.send_message(UserMessage(text="Start the interview with a brief introduction and first question."))
-        await manager.send_message(interview_id, {
-            "type": "ai_message",
-            "content": greeting
-        })
+        # A pre-generated opening question should land before the context is read
+        await wait_for_greeting(interview_id)
+        
+        # Get interview data; kept for the whole session
+        context = await load_interview_context(interview_id)
+        if not context:
+            await websocket.close()
+            return
+        conversation = context.conversation
         
-        # Update questions
-        await db.interviews.update_one(
-            {"id": interview_id},
-            {"$push": {"questions_asked": greeting}}
+        # Initialize AI interviewer, rehydrating any turns persisted before a reconnect
+        chat = llm.session(
+            session_id=interview_id,
+            history=conversation,
+            system_message=interview_system_message(context.jd, context.resume)
         )
         
+        if conversation:
+            # Pre-generated or reconnect: replay the stored pending question, no LLM call
+            last_question = conversation[-1]['content']
+            turn = len(conversation) // 2 - 1
+            await manager.send_message(interview_id, {
+                "type": "ai_message",
+                "content": last_question,
+                "resumed": True
+            })
+        else:
+            # Nothing pre-generated; send the greeting live
+            greeting = await send_ai_reply(
+                interview_id,
+                chat,
+                GREETING_PROMPT,
+                stream=stream,
+                call_site="greeting"
+            )
+            last_question = greeting
+            turn = 0
+            if not await store_greeting(interview_id, greeting):
+                logging.warning(f"Opening question for {interview_id} was already stored elsewhere")
+        
         while True:
             data = await websocket.receive_json()
+            count_websocket_message(data.get('type'))
             
             if data.get('type') == 'ping':
                 # Respond to heartbeat
@@ -394,18 +1448,25 @@ Rules:
             if data.get('type') == 'candidate_response':
                 # Send to AI
                 try:
-                    response = await chat.send_message(UserMessage(text=data['content']))
-                    
-                    await manager.send_message(interview_id, {
-                        "type": "ai_message",
-                        "content": response
-                    })
-                    
-                    # Update questions
-                    await db.interviews.update_one(
-                        {"id": interview_id},
-                        {"$push": {"questions_asked": response}}
+                    response = await send_ai_reply(
+                        interview_id,
+                        chat,
+                        data['content'],
+                        stream=stream
+                    )
+                    await record_turn(interview_id, data['content'], response)
+                    # Only answers that made it into the conversation are scored, so a
+                    # resent answer isn't scored twice and turns match `conversation`
+                    turn += 1
+                    schedule_answer_scoring(
+                        interview_id,
+                        turn,
+                        last_question,
+                        data['content'],
+                        context.jd.get('role_expectations', ''),
+                        context.resume.get('experience', '')
                     )
+                    last_question = response
                 except Exception as e:
                     logging.error(f"AI response error: {e}")
                     await manager.send_message(interview_id, {
@@ -420,10 +1481,7 @@ Rules:
                     "flag_type": data.get('flag_type', 'unknown'),
                     "description": data.get('description', '')
                 }
-                await db.interviews.update_one(
-                    {"id": interview_id},
-                    {"$push": {"integrity_flags": flag_dict}}
-                )
+                await flag_buffer.add(interview_id, flag_dict)
             
             elif data.get('type') == 'integrity_violation':
                 # Serious violation - mark interview as failed
@@ -433,7 +1491,9 @@ Rules:
                     "description": data.get('reason', 'Critical integrity violation'),
                     "action": data.get('action', 'terminate')
                 }
-                await db.interviews.update_one(
+                # Buffered flags land before the critical one
+                await flag_buffer.flush(interview_id)
+                previous = await db.interviews.find_one_and_update(
                     {"id": interview_id},
                     {
                         "$push": {"integrity_flags": flag_dict},
@@ -446,8 +1506,13 @@ Rules:
                                 "integrity_score": 0
                             }
                         }
-                    }
+                    },
+                    projection={"_id": 0, "status": 1},
+                    return_document=ReturnDocument.BEFORE
                 )
+                if previous is not None:
+                    await analytics.flags_pushed(interview_id, [flag_dict])
+                    await analytics.status_changed(previous.get("status"), "terminated")
                 
                 # Send termination message
                 await manager.send_message(interview_id, {
@@ -457,137 +1522,15 @@ Rules:
                 break
             
             elif data.get('type') == 'end_interview':
-                # Generate evaluation based on actual interview
+                # The evaluation runs as a durable job, so a dropped socket doesn't lose it
                 try:
-                    # Get the full interview data
-                    interview_doc = await db.interviews.find_one({"id": interview_id}, {"_id": 0})
-                    
-                    questions_asked = interview_doc.get('questions_asked', [])
-                    
-                    # Check if candidate actually responded (need at least 2 exchanges - greeting + 1 response)
-                    if len(questions_asked) <= 1:
-                        # No actual responses from candidate
-                        evaluation_data = {
-                            "overall_score": 0,
-                            "recommendation": "Cannot Evaluate - No Responses",
-                            "role_fit": {
-                                "skill_alignment": 0,
-                                "experience_relevance": 0,
-                                "project_applicability": 0
-                            },
-                            "performance": {
-                                "communication_clarity": 0,
-                                "depth_of_understanding": 0,
-                                "consistency_with_resume": 0
-                            },
-                            "behavioral_observations": {
-                                "confidence_indicators": "Not assessed",
-                                "nervousness_patterns": "Candidate did not respond to any questions",
-                                "responsiveness": "No responses provided"
-                            },
-                            "integrity_score": {
-                                "score": 0,
-                                "suspicious_moments": interview_doc.get('integrity_flags', [])
-                            },
-                            "strengths": ["Unable to assess - no interview responses captured"],
-                            "weaknesses": ["Did not participate in interview", "No responses provided to any questions"]
-                        }
-                        
-                        # Add integrity flags
-                        evaluation_data['integrity_flags'] = interview_doc.get('integrity_flags', [])
-                        
-                        # Save evaluation
-                        await db.interviews.update_one(
-                            {"id": interview_id},
-                            {"$set": {"evaluation": evaluation_data}}
-                        )
-                        
-                        await manager.send_message(interview_id, {
-                            "type": "evaluation",
-                            "content": evaluation_data
-                        })
-                        break
-                    
-                    eval_prompt = f"""Based on this interview, generate a comprehensive evaluation report in JSON format.
-
-Interview Details:
-- Questions Asked: {len(questions_asked)}
-- Integrity Flags: {len(interview_doc.get('integrity_flags', []))}
-
-Conversation History:
-{chr(10).join(questions_asked[:10])}
-
-Generate evaluation in this EXACT JSON format:
-{{
-    "overall_score": <number 0-100>,
-    "recommendation": "Strong fit / Moderate fit / Weak fit",
-    "role_fit": {{
-        "skill_alignment": <number 0-100>,
-        "experience_relevance": <number 0-100>,
-        "project_applicability": <number 0-100>
-    }},
-    "performance": {{
-        "communication_clarity": <number 0-100>,
-        "depth_of_understanding": <number 0-100>,
-        "consistency_with_resume": <number 0-100>
-    }},
-    "behavioral_observations": {{
-        "confidence_indicators": "High/Medium/Low",
-        "nervousness_patterns": "description",
-        "responsiveness": "description"
-    }},
-    "integrity_score": {{
-        "score": <number 0-100>,
-        "suspicious_moments": []
-    }},
-    "strengths": ["strength1", "strength2", "strength3"],
-    "weaknesses": ["weakness1", "weakness2"]
-}}
-
-Consider integrity flags in scoring. Return ONLY valid JSON.
-"""
-                    
-                    evaluation_text = await chat.send_message(UserMessage(text=eval_prompt))
-                    
-                    # Parse JSON from response
-                    import re
-                    import json as json_module
-                    
-                    # Try to extract JSON
-                    json_match = re.search(r'\{.*\}', evaluation_text, re.DOTALL)
-                    if json_match:
-                        evaluation_data = json_module.loads(json_match.group())
-                    else:
-                        # Fallback evaluation
-                        evaluation_data = {
-                            "overall_score": 50,
-                            "recommendation": "Moderate fit",
-                            "raw_text": evaluation_text
-                        }
-                    
-                    # Add integrity flags to evaluation
-                    evaluation_data['integrity_flags'] = interview_doc.get('integrity_flags', [])
-                    
-                    # Calculate integrity score based on flags
-                    flag_count = len(interview_doc.get('integrity_flags', []))
-                    integrity_score = max(0, 100 - (flag_count * 15))  # -15 points per flag
-                    evaluation_data['integrity_score'] = {
-                        "score": integrity_score,
-                        "suspicious_moments": interview_doc.get('integrity_flags', [])
-                    }
-                    
-                    # Save evaluation
-                    await db.interviews.update_one(
-                        {"id": interview_id},
-                        {"$set": {"evaluation": evaluation_data}}
-                    )
-                    
+                    job = await request_evaluation(interview_id)
                     await manager.send_message(interview_id, {
-                        "type": "evaluation",
-                        "content": evaluation_data
+                        "type": "evaluation_pending",
+                        "job_id": job["id"]
                     })
                 except Exception as e:
-                    logging.error(f"Evaluation generation error: {e}")
+                    logging.error(f"Failed to queue evaluation for {interview_id}: {e}")
                     await manager.send_message(interview_id, {
                         "type": "error",
                         "message": "Failed to generate evaluation"
@@ -595,19 +1538,26 @@ Consider integrity flags in scoring. Return ONLY valid JSON.
                 break
     
     except WebSocketDisconnect:
-        manager.disconnect(interview_id)
+        pass
     except Exception as e:
         logging.error(f"WebSocket error: {e}")
-        manager.disconnect(interview_id)
+    finally:
+        manager.disconnect(interview_id, websocket)
+        await flag_buffer.close(interview_id)
 
 app.include_router(api_router)
 
+@app.get("/metrics")
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 logging.basicConfig(
@@ -616,6 +1566,58 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def start_loop_monitor():
+    if LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+
+@app.on_event("startup")
+async def start_backplane():
+    await manager.backplane.start(manager.deliver_local)
+
+@app.on_event("startup")
+async def start_job_workers():
+    job_queue.register(EVALUATION_JOB, run_evaluation_job)
+    job_queue.start()
+    role_fit_queue.register(ROLE_FIT_JOB, run_role_fit_job, on_failed=fail_role_fit_job)
+    role_fit_queue.start()
+
+@app.on_event("startup")
+async def load_resume_index():
+    # Searches wait for the initial load; startup doesn't
+    resume_index.start_loading(db.candidate_resumes)
+
+@app.on_event("startup")
+async def ensure_indexes():
+    try:
+        report = await reconcile_indexes(db)
+        logging.info(f"Index reconciliation: {report}")
+    except Exception as e:
+        logging.error(f"Failed to reconcile indexes: {e}")
+
+@app.on_event("shutdown")
+async def stop_backplane():
+    await manager.backplane.close()
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    # In-flight jobs go back to the queue before the client closes
+    await job_queue.close()
+    await role_fit_queue.close()
+
+@app.on_event("shutdown")
+async def flush_integrity_flags():
+    # Hooks run in registration order; buffered flags need the client open
+    await flag_buffer.flush_all()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    client.close()
+
+@app.on_event("shutdown")
+async def stop_loop_monitor():
+    loop_monitor.stop()
+
+@app.on_event("shutdown")
+async def shutdown_parser_pool():
+    parser_pool.shutdown()
\ No newline at end of file
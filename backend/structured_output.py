@@ -0,0 +1,135 @@
+"""Parsing for JSON objects the LLM returns inside free text.
+
+Replies wrap the JSON in prose or code fences and sometimes nest objects, so
+regexes like `\\{[^}]+\\}` or a greedy `\\{.*\\}` either cut it short or swallow
+trailing text. Here candidates are found with a brace-aware scan that skips
+braces inside strings, parsed, and validated against a pydantic model. When
+nothing validates, the caller may supply one repair call that is shown the
+output, the schema and the error. Outcomes are counted per call site.
+"""
+import json
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from metrics import STRUCTURED_OUTPUT_PARSES
+
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+logger = logging.getLogger("structured_output")
+
+
+def iter_json_objects(text: str) -> Iterator[str]:
+    """Balanced `{...}` spans in order, skipping braces inside JSON strings.
+
+    A span that turns out not to be JSON, or never closes, is retried from
+    the next brace, so a stray `{` in prose doesn't hide the object after it.
+    """
+    start = text.find("{")
+    while start != -1:
+        depth = 0
+        in_string = False
+        escaped = False
+        end = -1
+        for index in range(start, len(text)):
+            char = text[index]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    end = index
+                    break
+        if end != -1:
+            yield text[start:end + 1]
+        # An unbalanced `{` (or a stray quote after it) can precede a real object
+        start = text.find("{", start + 1)
+
+
+def _loads(candidate: str) -> Optional[Dict[str, Any]]:
+    for attempt in (candidate, _TRAILING_COMMA.sub(r"\1", candidate)):
+        try:
+            data = json.loads(attempt)
+        except ValueError:
+            continue
+        return data if isinstance(data, dict) else None
+    return None
+
+
+def extract_json(text: str) -> Optional[Dict[str, Any]]:
+    """First JSON object in the text, unvalidated"""
+    for candidate in iter_json_objects(text):
+        data = _loads(candidate)
+        if data is not None:
+            return data
+    return None
+
+
+def validate_json(text: str, model: Type[BaseModel],
+                  defaults: Optional[Dict[str, Any]] = None) -> Tuple[Optional[Dict[str, Any]], str]:
+    """First object that validates against `model`, or the reason none did.
+
+    `defaults` fill fields the prompt doesn't ask for; they are used for
+    validation only and are not added to the returned object.
+    """
+    error = "no JSON object found"
+    for candidate in iter_json_objects(text):
+        data = _loads(candidate)
+        if data is None:
+            error = "invalid JSON"
+            continue
+        try:
+            model.model_validate({**(defaults or {}), **data})
+        except ValidationError as e:
+            error = str(e)
+            continue
+        return data, ""
+    return None, error
+
+
+def repair_prompt(text: str, model: Type[BaseModel], error: str) -> str:
+    schema = json.dumps(model.model_json_schema(), separators=(",", ":"))
+    return f"""The output below was supposed to be a JSON object matching this JSON schema:
+{schema}
+
+It could not be used: {error[:1000]}
+
+Output:
+{text[:6000]}
+
+Return ONLY the corrected JSON object."""
+
+
+async def parse_structured(text: str, model: Type[BaseModel], call_site: str,
+                           repair: Optional[Callable[[str], Awaitable[str]]] = None,
+                           defaults: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Validated JSON object from an LLM reply, with at most one repair call"""
+    data, error = validate_json(text, model, defaults)
+    if data is not None:
+        STRUCTURED_OUTPUT_PARSES.labels(call_site, "parsed").inc()
+        return data
+
+    if repair is not None:
+        try:
+            repaired = await repair(repair_prompt(text, model, error))
+            data, error = validate_json(repaired, model, defaults)
+        except Exception as e:
+            error = f"repair failed: {e}"
+        if data is not None:
+            STRUCTURED_OUTPUT_PARSES.labels(call_site, "repaired").inc()
+            return data
+
+    STRUCTURED_OUTPUT_PARSES.labels(call_site, "failed").inc()
+    logger.warning(f"Unusable {call_site} output: {error[:500]}")
+    return None
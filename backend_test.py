@@ -80,7 +80,7 @@ class AIInterviewAPITester:
             print(f"✅ Interview ID captured: {self.interview_id}")
             
             # Verify response structure
-            required_fields = ['interview_id', 'job_description', 'candidate_resume', 'role_fit_analysis']
+            required_fields = ['interview_id', 'job_description', 'candidate_resume', 'role_fit_status']
             for field in required_fields:
                 if field not in response:
                     print(f"⚠️  Missing field in response: {field}")
@@ -1,5 +1,6 @@
 import requests
 import json
+import time
 import asyncio
 import websockets
 from datetime import datetime
@@ -25,6 +26,19 @@ class ComprehensiveInterviewTest:
                 print(f"   {details}")
         return condition
     
+    async def wait_for_evaluation(self, interview_id, timeout=60.0, interval=2.0):
+        """Poll the evaluation job until it is ready or failed"""
+        deadline = time.time() + timeout
+        data = {}
+        while time.time() < deadline:
+            response = requests.get(f"{self.base_url}/api/interview/{interview_id}/evaluation", timeout=30)
+            if response.status_code == 200:
+                data = response.json()
+                if data.get('status') in ('ready', 'failed'):
+                    return data
+            await asyncio.sleep(interval)
+        return data
+    
     def test_interview_setup(self):
         """Test complete interview setup flow"""
         print("\n🔧 Testing Interview Setup Flow...")
@@ -49,11 +63,20 @@ class ComprehensiveInterviewTest:
         self.test("Interview ID Generated", bool(self.interview_id), f"ID: {self.interview_id}")
         self.test("Job Description Created", 'job_description' in data)
         self.test("Candidate Resume Created", 'candidate_resume' in data)
-        self.test("Role Fit Analysis Generated", 'role_fit_analysis' in data)
+        self.test("Role Fit Analysis Scheduled", data.get('role_fit_status') == 'pending')
+        
+        # Role fit runs in the background - poll until it settles
+        analysis = None
+        for _ in range(30):
+            fit = requests.get(f"{self.base_url}/api/interview/{self.interview_id}/role-fit", timeout=30).json()
+            if fit.get('status') != 'pending':
+                analysis = fit.get('role_fit_analysis')
+                break
+            time.sleep(2)
+        self.test("Role Fit Analysis Generated", analysis is not None)
         
         # Verify role fit analysis structure
-        if 'role_fit_analysis' in data:
-            analysis = data['role_fit_analysis']
+        if analysis:
             self.test("Match Score Present", 'match_score' in analysis, f"Score: {analysis.get('match_score')}")
             self.test("Skill Match Level Present", 'skill_match_level' in analysis, f"Level: {analysis.get('skill_match_level')}")
         
@@ -201,18 +224,21 @@ class ComprehensiveInterviewTest:
                 end_msg = {"type": "end_interview"}
                 await websocket.send(json.dumps(end_msg))
                 
-                # Wait for evaluation
+                # The evaluation is queued as a job; the socket only confirms it
                 try:
                     message = await asyncio.wait_for(websocket.recv(), timeout=20.0)
                     data = json.loads(message)
-                    self.test("Evaluation Generated", data.get('type') == 'evaluation', f"Content length: {len(data.get('content', ''))}")
+                    self.test("Evaluation Queued", data.get('type') == 'evaluation_pending', f"Job: {data.get('job_id')}")
                 except asyncio.TimeoutError:
-                    self.test("Evaluation Generated", False, "Timeout waiting for evaluation")
+                    self.test("Evaluation Queued", False, "Timeout waiting for evaluation_pending")
                 
         except Exception as e:
             self.test("WebSocket Connection Established", False, f"Error: {str(e)}")
             return False
         
+        evaluation = await self.wait_for_evaluation(ws_interview_id)
+        self.test("Evaluation Generated", evaluation.get('status') == 'ready', f"Status: {evaluation.get('status')}")
+        
         # Verify data persistence
         await asyncio.sleep(2)
         response = requests.get(f"{self.base_url}/api/interview/{ws_interview_id}", timeout=30)
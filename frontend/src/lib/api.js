@@ -37,6 +37,11 @@ export const getInterview = async (id) => {
   return response.data;
 };
 
+export const getRoleFit = async (id) => {
+  const response = await api.get(`/interview/${id}/role-fit`);
+  return response.data;
+};
+
 export const startInterview = async (id) => {
   const response = await api.post(`/interview/${id}/start`);
   return response.data;
@@ -47,7 +52,15 @@ export const endInterview = async (id) => {
   return response.data;
 };
 
-export const getInterviews = async () => {
-  const response = await api.get('/interviews');
+export const getEvaluation = async (id) => {
+  const response = await api.get(`/interview/${id}/evaluation`);
   return response.data;
+};
+
+export const getInterviews = async (params = {}) => {
+  const response = await api.get('/interviews', { params });
+  return {
+    interviews: response.data,
+    nextCursor: response.headers['x-next-cursor'] || null
+  };
 };
\ No newline at end of file
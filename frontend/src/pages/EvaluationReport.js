@@ -6,7 +6,10 @@ import { Badge } from '@/components/ui/badge';
 import { Progress } from '@/components/ui/progress';
 import { TrendingUp, TrendingDown, CheckCircle2, AlertTriangle, Download, ArrowLeft } from 'lucide-react';
 import { toast } from 'sonner';
-import { getInterview } from '@/lib/api';
+import { getInterview, getEvaluation } from '@/lib/api';
+
+const EVALUATION_POLL_INTERVAL = 2000;
+const EVALUATION_POLL_ATTEMPTS = 90;
 
 export default function EvaluationReport() {
   const { id } = useParams();
@@ -21,6 +24,12 @@ export default function EvaluationReport() {
   const loadData = async () => {
     try {
       setLoading(true);
+      // Evaluations are generated in the background; wait until the job settles
+      for (let attempt = 0; attempt < EVALUATION_POLL_ATTEMPTS; attempt++) {
+        const evaluation = await getEvaluation(id);
+        if (evaluation.status !== 'pending' && evaluation.status !== 'running') break;
+        await new Promise(resolve => setTimeout(resolve, EVALUATION_POLL_INTERVAL));
+      }
       const result = await getInterview(id);
       setData(result);
     } catch (error) {
@@ -151,6 +160,11 @@ export default function EvaluationReport() {
               <div className="text-center">
                 <div className="text-6xl font-bold text-indigo-600 mb-2">{evaluation.overall_score}</div>
                 <div className="text-sm text-slate-600">Overall Score</div>
+                {data.evaluation.partial && (
+                  <div className="text-xs text-amber-600 mt-1" data-testid="partial-score-note">
+                    {data.evaluation.unscored_answers} answer(s) not scored
+                  </div>
+                )}
               </div>
               <div className="md:col-span-2 space-y-4">
                 <div>
@@ -13,6 +13,12 @@ export default function InterviewHistory() {
   const [loading, setLoading] = useState(true);
   const [interviews, setInterviews] = useState([]);
   const [searchTerm, setSearchTerm] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // Only the fields the list renders
+  const LIST_FIELDS = 'id,status,created_at,start_time,end_time';
+  const PAGE_SIZE = 50;
 
   useEffect(() => {
     loadInterviews();
@@ -21,8 +27,9 @@ export default function InterviewHistory() {
   const loadInterviews = async () => {
     try {
       setLoading(true);
-      const data = await getInterviews();
-      setInterviews(data);
+      const data = await getInterviews({ fields: LIST_FIELDS, limit: PAGE_SIZE });
+      setInterviews(data.interviews);
+      setNextCursor(data.nextCursor);
     } catch (error) {
       toast.error('Failed to load interviews');
     } finally {
@@ -30,6 +37,19 @@ export default function InterviewHistory() {
     }
   };
 
+  const loadMoreInterviews = async () => {
+    try {
+      setLoadingMore(true);
+      const data = await getInterviews({ fields: LIST_FIELDS, limit: PAGE_SIZE, after: nextCursor });
+      setInterviews(prev => [...prev, ...data.interviews]);
+      setNextCursor(data.nextCursor);
+    } catch (error) {
+      toast.error('Failed to load more interviews');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const getStatusIcon = (status) => {
     switch (status) {
       case 'completed':
@@ -166,6 +186,18 @@ export default function InterviewHistory() {
                 </CardContent>
               </Card>
             ))}
+            {nextCursor && (
+              <div className="flex justify-center">
+                <Button
+                  variant="outline"
+                  onClick={loadMoreInterviews}
+                  disabled={loadingMore}
+                  data-testid="load-more-interviews-button"
+                >
+                  {loadingMore ? 'Loading...' : 'Load More'}
+                </Button>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -43,6 +43,8 @@ export default function InterviewRoom() {
   
   const videoRef = useRef(null);
   const wsRef = useRef(null);
+  const streamingMessageIdRef = useRef(null);
+  const lastAiMessageRef = useRef(null);
   const streamRef = useRef(null);
   const timerRef = useRef(null);
   const faceDetectionRef = useRef(null);
@@ -455,7 +457,7 @@ export default function InterviewRoom() {
       return;
     }
 
-    const wsUrl = process.env.REACT_APP_BACKEND_URL.replace('http', 'ws') + `/api/interview/${id}/ws`;
+    const wsUrl = process.env.REACT_APP_BACKEND_URL.replace('http', 'ws') + `/api/interview/${id}/ws?stream=1`;
     
     // Clear existing connection if any
     if (wsRef.current) {
@@ -490,7 +492,27 @@ export default function InterviewRoom() {
         return;
       }
       
-      if (data.type === 'ai_message') {
+      if (data.type === 'ai_message_delta') {
+        // Streamed reply - show tokens as they arrive
+        if (streamingMessageIdRef.current !== data.message_id) {
+          streamingMessageIdRef.current = data.message_id;
+          setIsWaitingForAI(false);
+          setAiMessage(data.content);
+        } else {
+          setAiMessage(prev => prev + data.content);
+        }
+        return;
+      }
+      
+      if (data.type === 'ai_message' && data.resumed && lastAiMessageRef.current === data.content) {
+        // Reconnect replayed the question we are already showing
+        setIsWaitingForAI(false);
+        return;
+      }
+
+      if (data.type === 'ai_message' || data.type === 'ai_message_done') {
+        streamingMessageIdRef.current = null;
+        lastAiMessageRef.current = data.content;
         setIsWaitingForAI(false);
         setAiMessage(data.content);
         setTranscript(prev => [...prev, { speaker: 'AI', message: data.content, time: formatTime(timeElapsed) }]);
@@ -6,7 +6,7 @@ import { Badge } from '@/components/ui/badge';
 import { Progress } from '@/components/ui/progress';
 import { CheckCircle2, AlertCircle, TrendingUp, Briefcase, ArrowRight } from 'lucide-react';
 import { toast } from 'sonner';
-import { getInterview } from '@/lib/api';
+import { getInterview, getRoleFit } from '@/lib/api';
 
 export default function PreInterview() {
   const { id } = useParams();
@@ -19,26 +19,48 @@ export default function PreInterview() {
     loadData();
   }, [id]);
 
+  const ROLE_FIT_POLL_INTERVAL = 1500;
+  const ROLE_FIT_MAX_POLLS = 80;
+
+  // Role fit is analyzed in the background after setup - poll until it settles
+  const waitForRoleFit = async () => {
+    for (let attempt = 0; attempt < ROLE_FIT_MAX_POLLS; attempt++) {
+      const result = await getRoleFit(id);
+      if (result.status !== 'pending') {
+        return result.role_fit_analysis;
+      }
+      await new Promise(resolve => setTimeout(resolve, ROLE_FIT_POLL_INTERVAL));
+    }
+    return null;
+  };
+
   const loadData = async () => {
     try {
       setLoading(true);
       
       // Get interview data from localStorage first (from setup page)
       const setupData = localStorage.getItem(`interview_${id}`);
+      let analysis = null;
       if (setupData) {
         const parsed = JSON.parse(setupData);
-        setAnalysisData(parsed.role_fit_analysis);
+        analysis = parsed.role_fit_analysis;
         setInterviewData(parsed);
       } else {
         // Fallback: fetch from API
         const result = await getInterview(id);
+        analysis = result.role_fit_analysis;
         setInterviewData(result);
-        
-        // If no analysis in result, show error
-        if (!result.role_fit_analysis) {
-          toast.error('Analysis data not available');
-        }
       }
+      
+      if (!analysis) {
+        analysis = await waitForRoleFit();
+      }
+      
+      // If still no analysis, show error
+      if (!analysis) {
+        toast.error('Analysis data not available');
+      }
+      setAnalysisData(analysis);
     } catch (error) {
       toast.error('Failed to load interview data');
       console.error(error);
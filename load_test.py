@@ -0,0 +1,181 @@
+"""Concurrent interview load generator.
+
+Drives N simultaneous interviews through setup -> start -> WebSocket turns
+-> end and reports latency percentiles, throughput and error rate.
+
+For a fully offline run, start the backend against the mock LLM:
+
+    cd backend && LLM_BACKEND=mock MOCK_LLM_LATENCY_MS=lognormal:800:0.4 \
+        uvicorn server:app --port 8001
+
+then:
+
+    python load_test.py --base-url http://localhost:8001 --interviews 50 --turns 5 --stream
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import httpx
+import websockets
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class LoadTestResults:
+    def __init__(self):
+        self.setup_latencies: List[float] = []
+        self.first_question_latencies: List[float] = []
+        self.turn_latencies: List[float] = []
+        self.first_token_latencies: List[float] = []
+        self.evaluation_latencies: List[float] = []
+        self.completed_interviews = 0
+        self.turns = 0
+        self.errors: Counter = Counter()
+
+    def report(self, elapsed: float, interviews: int):
+        def line(name: str, values: List[float]):
+            if not values:
+                print(f"{name:<22} n=0")
+                return
+            print(
+                f"{name:<22} n={len(values):<6} p50={percentile(values, 50) * 1000:8.1f}ms "
+                f"p95={percentile(values, 95) * 1000:8.1f}ms p99={percentile(values, 99) * 1000:8.1f}ms "
+                f"max={max(values) * 1000:8.1f}ms"
+            )
+
+        print("\n" + "=" * 80)
+        print(f"Interviews: {self.completed_interviews}/{interviews} completed in {elapsed:.1f}s")
+        line("setup", self.setup_latencies)
+        line("first question", self.first_question_latencies)
+        line("turn (full reply)", self.turn_latencies)
+        line("turn (first token)", self.first_token_latencies)
+        line("evaluation", self.evaluation_latencies)
+        print(f"Throughput: {self.turns / elapsed:.2f} turns/s, {self.completed_interviews / elapsed:.2f} interviews/s")
+        total = interviews
+        failed = sum(self.errors.values())
+        print(f"Error rate: {failed / total * 100:.1f}% ({failed}/{total} interviews)")
+        for error, count in self.errors.most_common():
+            print(f"  {count:>5}  {error}")
+        print("=" * 80)
+
+
+class VirtualCandidate:
+    def __init__(self, index: int, args: argparse.Namespace, http: httpx.AsyncClient, results: LoadTestResults):
+        self.index = index
+        self.args = args
+        self.http = http
+        self.results = results
+
+    async def _receive_reply(self, websocket) -> Dict[str, Optional[float]]:
+        """Wait for one complete AI reply; returns time to first token and to completion"""
+        started = time.perf_counter()
+        first_token = None
+        while True:
+            data = json.loads(await asyncio.wait_for(websocket.recv(), self.args.timeout))
+            if data.get('type') == 'ai_message_delta':
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+            elif data.get('type') in ('ai_message', 'ai_message_done'):
+                total = time.perf_counter() - started
+                return {"first_token": first_token if first_token is not None else total, "total": total}
+            elif data.get('type') == 'error':
+                raise RuntimeError(f"server error: {data.get('message')}")
+
+    async def run(self):
+        setup_data = {
+            "job_title": "Load Test Engineer",
+            "candidate_name": f"Load Candidate {self.index}",
+            "candidate_email": f"load{self.index}@example.com",
+            "jd_text": "Backend engineer with Python, FastAPI and MongoDB experience.",
+            "resume_text": f"Candidate {self.index}: five years of Python, FastAPI and MongoDB."
+        }
+        started = time.perf_counter()
+        response = await self.http.post("/api/interview/setup", json=setup_data)
+        response.raise_for_status()
+        self.results.setup_latencies.append(time.perf_counter() - started)
+        interview_id = response.json()['interview_id']
+
+        response = await self.http.post(f"/api/interview/{interview_id}/start")
+        response.raise_for_status()
+
+        ws_url = self.args.base_url.replace('https://', 'wss://').replace('http://', 'ws://')
+        ws_url += f"/api/interview/{interview_id}/ws"
+        if self.args.stream:
+            ws_url += "?stream=1"
+
+        async with websockets.connect(ws_url, max_size=None) as websocket:
+            connected = time.perf_counter()
+            await self._receive_reply(websocket)
+            self.results.first_question_latencies.append(time.perf_counter() - connected)
+
+            for turn in range(self.args.turns):
+                if self.args.think_time:
+                    await asyncio.sleep(self.args.think_time)
+                await websocket.send(json.dumps({
+                    "type": "candidate_response",
+                    "content": f"Answer {turn} from candidate {self.index}: I designed and shipped the service end to end."
+                }))
+                reply = await self._receive_reply(websocket)
+                self.results.turn_latencies.append(reply["total"])
+                self.results.first_token_latencies.append(reply["first_token"])
+                self.results.turns += 1
+
+            ended = time.perf_counter()
+            await websocket.send(json.dumps({"type": "end_interview"}))
+            while True:
+                data = json.loads(await asyncio.wait_for(websocket.recv(), self.args.timeout))
+                if data.get('type') in ('evaluation', 'evaluation_pending'):
+                    break
+                if data.get('type') == 'error':
+                    raise RuntimeError(f"server error: {data.get('message')}")
+            self.results.evaluation_latencies.append(time.perf_counter() - ended)
+
+        self.results.completed_interviews += 1
+
+
+async def run_load_test(args: argparse.Namespace) -> LoadTestResults:
+    results = LoadTestResults()
+    limits = httpx.Limits(max_connections=args.interviews, max_keepalive_connections=args.interviews)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as http:
+
+        async def run_candidate(index: int):
+            # Spread arrivals over the ramp-up window
+            await asyncio.sleep(args.ramp_up * index / max(1, args.interviews))
+            try:
+                await VirtualCandidate(index, args, http, results).run()
+            except Exception as e:
+                results.errors[f"{type(e).__name__}: {str(e)[:80]}"] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(run_candidate(i) for i in range(args.interviews)))
+        results.report(time.perf_counter() - started, args.interviews)
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--interviews", type=int, default=10, help="simultaneous interviews")
+    parser.add_argument("--turns", type=int, default=5, help="candidate answers per interview")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="seconds over which interviews start")
+    parser.add_argument("--think-time", type=float, default=0.0, help="seconds between a reply and the next answer")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-message timeout in seconds")
+    parser.add_argument("--stream", action="store_true", help="use streamed replies (?stream=1)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    import sys
+    results = asyncio.run(run_load_test(parse_args()))
+    sys.exit(1 if results.errors else 0)
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from backplane import Backplane, InMemoryBackplane, MongoBackplane
+
+
+class Worker:
+    """Stands in for a ConnectionManager holding some interviews' sockets"""
+
+    def __init__(self, backplane: Backplane, owned):
+        self.backplane = backplane
+        self.owned = set(owned)
+        self.delivered = []
+        self.seen = []
+
+    async def deliver_local(self, interview_id, message):
+        self.seen.append((interview_id, message))
+        if interview_id in self.owned:
+            self.delivered.append((interview_id, message))
+
+
+async def settle(polls=5, poll_interval=0.02):
+    await asyncio.sleep(polls * poll_interval)
+
+
+def test_backplane_requires_publish():
+    class Incomplete(Backplane):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_in_memory_backplane_delivers_locally():
+    async def scenario():
+        worker = Worker(InMemoryBackplane(), owned={"iv-1"})
+        await worker.backplane.start(worker.deliver_local)
+        await worker.backplane.publish("iv-1", {"type": "evaluation_pending"})
+        await worker.backplane.publish("iv-2", {"type": "ignored"})
+        assert worker.delivered == [("iv-1", {"type": "evaluation_pending"})]
+
+    asyncio.run(scenario())
+
+
+def test_in_memory_backplane_survives_handler_errors():
+    async def scenario():
+        backplane = InMemoryBackplane()
+
+        async def broken(interview_id, message):
+            raise RuntimeError("socket gone")
+
+        await backplane.start(broken)
+        await backplane.publish("iv-1", {"type": "ai_message"})
+
+    asyncio.run(scenario())
+
+
+def test_mongo_backplane_delivers_through_the_owning_worker():
+    async def scenario():
+        db = AsyncMongoMockClient()["backplane_test"]
+        first = Worker(MongoBackplane(db, poll_interval=0.02), owned={"iv-1"})
+        second = Worker(MongoBackplane(db, poll_interval=0.02), owned={"iv-2"})
+        for worker in (first, second):
+            await worker.backplane.start(worker.deliver_local)
+        try:
+            await first.backplane.publish("iv-2", {"type": "ai_message", "n": 1})
+            await second.backplane.publish("iv-1", {"type": "ai_message", "n": 2})
+            await settle()
+        finally:
+            await first.backplane.close()
+            await second.backplane.close()
+
+        assert second.delivered == [("iv-2", {"type": "ai_message", "n": 1})]
+        assert first.delivered == [("iv-1", {"type": "ai_message", "n": 2})]
+        # A worker never handles what it published itself
+        assert [message["n"] for _, message in first.seen] == [2]
+        assert [message["n"] for _, message in second.seen] == [1]
+
+    asyncio.run(scenario())
+
+
+def test_mongo_backplane_dedupes_when_the_cursor_reopens():
+    async def scenario():
+        db = AsyncMongoMockClient()["backplane_test"]
+        publisher = MongoBackplane(db, poll_interval=0.02)
+        owner = Worker(MongoBackplane(db, poll_interval=0.02), owned={"iv-1"})
+        await owner.backplane.start(owner.deliver_local)
+        try:
+            await publisher.publish("iv-1", {"type": "ai_message", "n": 1})
+            # Each reopen looks back REOPEN_SLACK and reads the document again
+            await settle(polls=10)
+            await publisher.publish("iv-1", {"type": "ai_message", "n": 2})
+            await settle(polls=10)
+        finally:
+            await owner.backplane.close()
+
+        assert [message["n"] for _, message in owner.delivered] == [1, 2]
+
+    asyncio.run(scenario())
@@ -0,0 +1,117 @@
+import asyncio
+
+from flag_buffer import IntegrityFlagBuffer
+
+
+class FakeInterviews:
+    """Records $push batches; can fail or stall writes"""
+
+    def __init__(self, fail=False, delay=0.0):
+        self.fail = fail
+        self.delay = delay
+        self.batches = []
+
+    async def update_one(self, query, update):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("mongo unavailable")
+        self.batches.append((query["id"], update["$push"]["integrity_flags"]["$each"]))
+
+
+def flag(flag_type, description=""):
+    return {"flag_type": flag_type, "description": description}
+
+
+def make_buffer(collection, **options):
+    flushed = []
+
+    async def on_flush(interview_id, batch):
+        flushed.append((interview_id, batch))
+
+    settings = {"batch_size": 20, "flush_interval": 0.02, "dedupe_window": 0.1, "on_flush": on_flush}
+    settings.update(options)
+    return IntegrityFlagBuffer(collection, **settings), flushed
+
+
+def test_full_batch_is_written_at_once():
+    async def scenario():
+        collection = FakeInterviews()
+        buffer, flushed = make_buffer(collection, batch_size=2)
+        await buffer.add("iv-1", flag("no_face"))
+        assert collection.batches == []
+        await buffer.add("iv-1", flag("multiple_faces"))
+        assert collection.batches == [("iv-1", [flag("no_face"), flag("multiple_faces")])]
+        assert flushed == collection.batches
+        await buffer.close("iv-1")
+
+    asyncio.run(scenario())
+
+
+def test_timer_flushes_and_duplicates_are_dropped():
+    async def scenario():
+        collection = FakeInterviews()
+        buffer, _ = make_buffer(collection)
+        assert await buffer.add("iv-1", flag("no_face", "a"))
+        assert not await buffer.add("iv-1", flag("no_face", "a"))
+        assert await buffer.add("iv-1", flag("no_face", "b"))
+        await asyncio.sleep(0.05)
+        assert collection.batches == [("iv-1", [flag("no_face", "a"), flag("no_face", "b")])]
+        await buffer.close("iv-1")
+
+    asyncio.run(scenario())
+
+
+def test_failed_flush_is_retried():
+    async def scenario():
+        collection = FakeInterviews(fail=True)
+        buffer, flushed = make_buffer(collection)
+        await buffer.add("iv-1", flag("no_face"))
+        await asyncio.sleep(0.05)
+        assert collection.batches == []
+        collection.fail = False
+        await asyncio.sleep(0.05)
+        assert collection.batches == [("iv-1", [flag("no_face")])]
+        assert flushed == collection.batches
+        await buffer.close("iv-1")
+
+    asyncio.run(scenario())
+
+
+def test_idle_interview_state_is_evicted():
+    async def scenario():
+        buffer, _ = make_buffer(FakeInterviews())
+        await buffer.add("iv-1", flag("no_face"))
+        assert "iv-1" in buffer._interviews
+        # Flushed, then kept until the dedupe window passes
+        await asyncio.sleep(0.25)
+        assert "iv-1" not in buffer._interviews
+
+    asyncio.run(scenario())
+
+
+def test_close_during_a_slow_flush_keeps_the_batch():
+    async def scenario():
+        collection = FakeInterviews(delay=0.1)
+        buffer, flushed = make_buffer(collection)
+        await buffer.add("iv-1", flag("no_face"))
+        # Let the timer start its write, then disconnect mid-write
+        await asyncio.sleep(0.04)
+        await buffer.close("iv-1")
+        assert collection.batches == [("iv-1", [flag("no_face")])]
+        assert flushed == collection.batches
+        assert "iv-1" not in buffer._interviews
+
+    asyncio.run(scenario())
+
+
+def test_flush_all_writes_every_interview():
+    async def scenario():
+        collection = FakeInterviews()
+        buffer, _ = make_buffer(collection, flush_interval=10)
+        await buffer.add("iv-1", flag("no_face"))
+        await buffer.add("iv-2", flag("multiple_faces"))
+        await buffer.flush_all()
+        assert sorted(interview_id for interview_id, _ in collection.batches) == ["iv-1", "iv-2"]
+        assert buffer._interviews == {}
+
+    asyncio.run(scenario())
@@ -0,0 +1,210 @@
+import asyncio
+from datetime import datetime
+
+from mongomock_motor import AsyncMongoMockClient
+
+from job_queue import JobQueue, RetryLater
+
+
+def make_queue(collection, **options) -> JobQueue:
+    settings = {"workers": 1, "lease_seconds": 0.3, "max_attempts": 3, "poll_interval": 0.02,
+                "retry_backoff": 0.01}
+    settings.update(options)
+    return JobQueue(collection, **settings)
+
+
+def new_collection():
+    return AsyncMongoMockClient()["job_queue_test"]["jobs"]
+
+
+async def wait_for_status(queue: JobQueue, key: str, status: str, timeout: float = 3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        job = await queue.get("test", key)
+        if job is not None and job["status"] == status:
+            return job
+        assert asyncio.get_running_loop().time() < deadline, f"job {key} stuck at {job and job['status']}"
+        await asyncio.sleep(0.02)
+
+
+def test_enqueue_is_idempotent_per_key():
+    async def scenario():
+        queue = make_queue(new_collection())
+        first = await queue.enqueue("test", "a", {"n": 1})
+        second = await queue.enqueue("test", "a", {"n": 2})
+        assert first["id"] == second["id"]
+        assert second["payload"] == {"n": 1}
+        assert "_id" not in first
+        assert await queue.collection.count_documents({}) == 1
+
+    asyncio.run(scenario())
+
+
+def test_job_runs_and_finishes():
+    async def scenario():
+        queue = make_queue(new_collection())
+        seen = []
+
+        async def handler(payload):
+            seen.append(payload)
+
+        queue.register("test", handler)
+        queue.start()
+        try:
+            await queue.enqueue("test", "a", {"n": 1})
+            job = await wait_for_status(queue, "a", "done")
+        finally:
+            await queue.close()
+        assert seen == [{"n": 1}]
+        assert job["attempts"] == 1
+        assert job["lease_owner"] is None
+
+    asyncio.run(scenario())
+
+
+def test_failures_retry_then_fail_and_requeue():
+    async def scenario():
+        queue = make_queue(new_collection())
+        attempts = []
+        failed = []
+
+        async def handler(payload):
+            attempts.append(payload)
+            raise RuntimeError("provider down")
+
+        async def on_failed(payload, error):
+            failed.append((payload, error))
+
+        queue.register("test", handler, on_failed=on_failed)
+        queue.start()
+        try:
+            await queue.enqueue("test", "a", {"n": 1})
+            job = await wait_for_status(queue, "a", "failed")
+            assert len(attempts) == 3
+            assert job["last_error"] == "provider down"
+            assert failed == [({"n": 1}, "provider down")]
+
+            # Enqueueing a failed job starts it over
+            job = await queue.enqueue("test", "a", {"n": 2})
+            assert job["attempts"] == 0
+            await wait_for_status(queue, "a", "failed")
+            assert attempts[-1] == {"n": 2}
+        finally:
+            await queue.close()
+
+    asyncio.run(scenario())
+
+
+def test_retry_later_does_not_spend_attempts():
+    async def scenario():
+        queue = make_queue(new_collection(), max_attempts=1)
+        calls = []
+
+        async def handler(payload):
+            calls.append(1)
+            if len(calls) < 4:
+                raise RetryLater(0.01, "inputs not ready")
+
+        queue.register("test", handler)
+        queue.start()
+        try:
+            await queue.enqueue("test", "a", {})
+            job = await wait_for_status(queue, "a", "done")
+        finally:
+            await queue.close()
+        assert len(calls) == 4
+        assert job["attempts"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_lease_is_renewed_while_the_handler_runs():
+    async def scenario():
+        collection = new_collection()
+        owner = make_queue(collection)
+        other = make_queue(collection)
+        runs = []
+
+        async def handler(payload):
+            runs.append(1)
+            # Several lease lengths
+            await asyncio.sleep(1.0)
+
+        owner.register("test", handler)
+        other.register("test", handler)
+        owner.start()
+        try:
+            await owner.enqueue("test", "a", {})
+            await wait_for_status(owner, "a", "running")
+            other.start()
+            job = await wait_for_status(owner, "a", "done")
+        finally:
+            await owner.close()
+            await other.close()
+        assert runs == [1]
+        assert job["attempts"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_expired_lease_is_taken_over_and_the_old_run_cancelled():
+    async def scenario():
+        collection = new_collection()
+        stalled = make_queue(collection)
+        rescuer = make_queue(collection)
+        cancelled = asyncio.Event()
+
+        async def hang(payload):
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async def finish(payload):
+            pass
+
+        stalled.register("test", hang)
+        rescuer.register("test", finish)
+        stalled.start()
+        try:
+            await stalled.enqueue("test", "a", {})
+            await wait_for_status(stalled, "a", "running")
+            # As if the stalled worker had stopped renewing
+            await collection.update_one({"key": "a"}, {"$set": {"lease_expires_at": datetime(2000, 1, 1)}})
+            job = await rescuer._claim()
+            assert job is not None and job["attempts"] == 2
+            assert job["lease_owner"] == rescuer.worker_id
+
+            # The stalled worker sees the lease is gone on its next renewal
+            await asyncio.wait_for(cancelled.wait(), 2)
+            await rescuer._run(job)
+            job = await rescuer.get("test", "a")
+            assert job["status"] == "done"
+        finally:
+            await stalled.close()
+            await rescuer.close()
+
+    asyncio.run(scenario())
+
+
+def test_close_releases_running_jobs_without_spending_an_attempt():
+    async def scenario():
+        collection = new_collection()
+        queue = make_queue(collection)
+
+        async def hang(payload):
+            await asyncio.sleep(60)
+
+        queue.register("test", hang)
+        queue.start()
+        await queue.enqueue("test", "a", {})
+        await wait_for_status(queue, "a", "running")
+        await queue.close()
+
+        job = await queue.get("test", "a")
+        assert job["status"] == "queued"
+        assert job["attempts"] == 0
+        assert job["lease_owner"] is None
+
+    asyncio.run(scenario())
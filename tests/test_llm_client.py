@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+import pytest
+
+from llm_client import CircuitBreaker, LLMClient, LLMUnavailable
+from llm_scheduler import (
+    LLMScheduler, PRIORITY_EVALUATION, PRIORITY_LIVE_TURN, SchedulerQueueFull
+)
+
+
+def half_open(breaker: CircuitBreaker):
+    breaker.failures = breaker.threshold
+    breaker.opened_at = time.monotonic() - breaker.reset_after - 1
+
+
+def make_client(**scheduler_options) -> LLMClient:
+    client = LLMClient(api_key="test", max_retries=0)
+    client.breaker = CircuitBreaker(threshold=2, reset_after=30)
+    client.scheduler = LLMScheduler(**scheduler_options)
+    return client
+
+
+async def reply(text="ok"):
+    return text
+
+
+async def failing():
+    raise RuntimeError("provider down")
+
+
+def test_breaker_opens_after_threshold_and_rejects():
+    async def scenario():
+        client = make_client()
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await client.call(failing)
+        assert client.breaker.state == "open"
+        with pytest.raises(LLMUnavailable):
+            await client.call(lambda: reply())
+
+    asyncio.run(scenario())
+
+
+def test_half_open_trial_closes_breaker_on_success():
+    async def scenario():
+        client = make_client()
+        half_open(client.breaker)
+        assert await client.call(lambda: reply("trial")) == "trial"
+        assert client.breaker.state == "closed"
+
+    asyncio.run(scenario())
+
+
+def test_full_scheduler_queue_hands_back_half_open_trial():
+    async def scenario():
+        client = make_client(queue_limits={PRIORITY_LIVE_TURN: 0, PRIORITY_EVALUATION: 10})
+        half_open(client.breaker)
+        with pytest.raises(SchedulerQueueFull):
+            await client.call(lambda: reply(), priority=PRIORITY_LIVE_TURN)
+        # The next caller gets the trial instead of LLMUnavailable
+        assert await client.call(lambda: reply("trial"), priority=PRIORITY_EVALUATION) == "trial"
+        assert client.breaker.state == "closed"
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_while_queued_hands_back_half_open_trial():
+    async def scenario():
+        # One request of burst capacity, then effectively no refill
+        client = make_client(requests_per_second=0.001, tokens_per_minute=0)
+        await client.scheduler.acquire(PRIORITY_LIVE_TURN, 1)
+        half_open(client.breaker)
+
+        queued = asyncio.create_task(client.call(lambda: reply()))
+        await asyncio.sleep(0.05)
+        assert client.breaker._trial_in_flight
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert not client.breaker._trial_in_flight
+        assert client.breaker.state == "half_open"
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_stream_while_queued_hands_back_half_open_trial():
+    async def scenario():
+        client = make_client(requests_per_second=0.001, tokens_per_minute=0)
+        await client.scheduler.acquire(PRIORITY_LIVE_TURN, 1)
+        half_open(client.breaker)
+
+        async def chunks():
+            yield "never"
+
+        async def consume():
+            return [chunk async for chunk in client.call_stream(chunks)]
+
+        queued = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert not client.breaker._trial_in_flight
+
+    asyncio.run(scenario())
+
+
+def test_scheduler_serves_live_turns_before_background_work():
+    async def scenario():
+        scheduler = LLMScheduler(requests_per_second=20, tokens_per_minute=0, live_reserve=0)
+        # Drain the burst so waiters are released one refill at a time
+        for _ in range(20):
+            await scheduler.acquire(PRIORITY_LIVE_TURN, 1)
+        order = []
+
+        async def call(priority, name):
+            await scheduler.acquire(priority, 1)
+            order.append(name)
+
+        background = asyncio.create_task(call(PRIORITY_EVALUATION, "evaluation"))
+        await asyncio.sleep(0)
+        live = asyncio.create_task(call(PRIORITY_LIVE_TURN, "live"))
+        await asyncio.gather(background, live)
+        assert order == ["live", "evaluation"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,117 @@
+import asyncio
+from datetime import datetime
+
+from mongomock_motor import AsyncMongoMockClient
+
+from resume_index import ResumeIndex
+
+
+def new_db():
+    return AsyncMongoMockClient()["resume_index_test"]
+
+
+JD = "Backend engineer: Python, Django, PostgreSQL and Kafka"
+
+
+def test_search_ranks_matching_resumes_first():
+    async def scenario():
+        index = ResumeIndex(new_db().resume_index)
+        await index.add("python", "Python developer, Django REST APIs on PostgreSQL, Kafka consumers")
+        await index.add("partial", "Python scripting and some PostgreSQL reporting")
+        await index.add("designer", "Figma and brand identity design")
+        results = index.search(JD)
+        assert [resume_id for resume_id, _ in results] == ["python", "partial"]
+        assert results[0][1] > results[1][1] > 0
+        assert index.search(JD, limit=1) == results[:1]
+
+    asyncio.run(scenario())
+
+
+def test_readding_a_resume_replaces_it():
+    async def scenario():
+        index = ResumeIndex(new_db().resume_index)
+        await index.add("r1", "Frontend work in React")
+        assert index.search("Kafka") == []
+        # Versions are millisecond timestamps
+        await asyncio.sleep(0.002)
+        await index.add("r1", "Frontend work in React", skills=["Kafka"])
+        assert [resume_id for resume_id, _ in index.search("Kafka")] == ["r1"]
+        assert len(index) == 1
+
+    asyncio.run(scenario())
+
+
+def test_refresh_picks_up_other_workers_writes():
+    async def scenario():
+        db = new_db()
+        mine, theirs = ResumeIndex(db.resume_index), ResumeIndex(db.resume_index)
+        await mine.refresh()
+        await theirs.add("r1", "Kafka streaming pipelines")
+        assert mine.search("Kafka") == []
+        await mine.refresh()
+        assert [resume_id for resume_id, _ in mine.search("Kafka")] == ["r1"]
+
+    asyncio.run(scenario())
+
+
+def test_load_indexes_resumes_written_before_the_index():
+    async def scenario():
+        db = new_db()
+        await db.candidate_resumes.insert_one({"id": "r1", "experience": "Django developer", "skills": ["Kafka"]})
+        index = ResumeIndex(db.resume_index)
+        index.start_loading(db.candidate_resumes)
+        await index.refresh()
+        assert [resume_id for resume_id, _ in index.search("Kafka Django")] == ["r1"]
+        assert await db.resume_index.count_documents({}) == 1
+
+    asyncio.run(scenario())
+
+
+def test_failed_load_is_retried_on_refresh():
+    async def scenario():
+        db = new_db()
+        await db.resume_index.insert_one({
+            "resume_id": "r1", "terms": [["kafka", 1]], "length": 1, "indexed_at": datetime(2024, 1, 1)
+        })
+
+        class Flaky:
+            def __init__(self, collection):
+                self.collection = collection
+                self.failures = 1
+
+            def find(self, *args, **kwargs):
+                if self.failures:
+                    self.failures -= 1
+                    raise ConnectionError("mongo unreachable")
+                return self.collection.find(*args, **kwargs)
+
+        index = ResumeIndex(Flaky(db.resume_index))
+        index.start_loading()
+        await asyncio.sleep(0)
+        await asyncio.gather(index._loading, return_exceptions=True)
+        await index.refresh()
+        assert [resume_id for resume_id, _ in index.search("Kafka")] == ["r1"]
+
+    asyncio.run(scenario())
+
+
+def test_dead_slots_are_compacted():
+    async def scenario():
+        index = ResumeIndex(new_db().resume_index)
+        # Compact on every tombstone
+        index.COMPACT_MIN_DEAD = 1
+        index.COMPACT_RATIO = 0
+        await index.add_many([("r1", "Kafka", []), ("r2", "Django", []), ("r3", "Kafka Django", [])])
+        for round_ in range(3):
+            # Fresh timestamps, so every re-add supersedes the last one
+            await asyncio.sleep(0.002)
+            await index.add("r1", "Kafka", [f"skill{round_}"])
+        assert index._dead == 0
+        assert len(index._slot_ids) == len(index) == 3
+        assert all(max(slots) < 3 for slots, _ in index._postings.values())
+        assert [resume_id for resume_id, _ in index.search("Kafka Django")][0] == "r3"
+        assert {resume_id for resume_id, _ in index.search("Kafka")} == {"r1", "r3"}
+        assert [resume_id for resume_id, _ in index.search("skill2")] == ["r1"]
+        assert index.search("skill0") == []
+
+    asyncio.run(scenario())
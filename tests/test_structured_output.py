@@ -0,0 +1,64 @@
+import asyncio
+
+from pydantic import BaseModel
+
+from structured_output import extract_json, iter_json_objects, parse_structured, validate_json
+
+
+class Score(BaseModel):
+    score: int
+    note: str = ""
+
+
+def test_nested_objects_are_returned_whole():
+    text = 'Result: {"score": 80, "detail": {"skills": {"python": 90}}} trailing {text}'
+    assert extract_json(text) == {"score": 80, "detail": {"skills": {"python": 90}}}
+
+
+def test_braces_inside_strings_are_ignored():
+    text = '{"note": "uses {curly} braces and a \\"quoted }\\" word", "score": 3}'
+    assert extract_json(text) == {"note": 'uses {curly} braces and a "quoted }" word', "score": 3}
+
+
+def test_code_fences_and_prose_around_the_object():
+    text = 'Here is the evaluation:\n```json\n{\n  "score": 72,\n  "note": "solid",\n}\n```\nHope this helps.'
+    assert extract_json(text) == {"score": 72, "note": "solid"}
+
+
+def test_stray_brace_before_the_object():
+    assert extract_json('Use {name} as a placeholder. {"score": 5}') == {"score": 5}
+
+
+def test_unclosed_brace_before_the_object():
+    assert extract_json('The set {1, 2 never closes. {"score": 5}') == {"score": 5}
+    assert extract_json('He wrote {"unterminated and then {"score": 6}') == {"score": 6}
+
+
+def test_no_object():
+    assert extract_json("no json here") is None
+    assert extract_json("only an opening { brace") is None
+    assert list(iter_json_objects("")) == []
+
+
+def test_validation_skips_objects_of_the_wrong_shape():
+    text = 'Example: {"foo": 1}. Answer: {"score": 9, "note": "ok"}'
+    data, error = validate_json(text, Score)
+    assert data == {"score": 9, "note": "ok"}
+    assert error == ""
+
+    data, error = validate_json('{"foo": 1}', Score)
+    assert data is None
+    assert "score" in error
+
+
+def test_parse_structured_makes_one_repair_call():
+    calls = []
+
+    async def repair(prompt):
+        calls.append(prompt)
+        return '{"score": 4}'
+
+    data = asyncio.run(parse_structured("not json", Score, "test", repair=repair))
+    assert data == {"score": 4}
+    assert len(calls) == 1
+    assert "no JSON object found" in calls[0]
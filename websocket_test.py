@@ -136,19 +136,25 @@ class WebSocketTester:
                 print("🏁 Ending interview...")
                 await websocket.send(json.dumps(end_message))
                 
-                # Wait for evaluation
+                # The evaluation is queued as a job; the socket only confirms it
                 try:
                     message = await asyncio.wait_for(websocket.recv(), timeout=20.0)
                     data = json.loads(message)
                     self.messages_received.append(data)
                     
-                    if data.get('type') == 'evaluation':
-                        print(f"✅ Evaluation received: {data['content'][:100]}...")
+                    if data.get('type') == 'evaluation_pending':
+                        print(f"✅ Evaluation queued: job {data.get('job_id')}")
                     else:
                         print(f"⚠️ Unexpected message type: {data.get('type')}")
                         
                 except asyncio.TimeoutError:
-                    print("❌ Timeout waiting for evaluation")
+                    print("❌ Timeout waiting for evaluation_pending")
+                
+                evaluation = await self.wait_for_evaluation()
+                if evaluation.get('status') == 'ready':
+                    print(f"✅ Evaluation ready: {str(evaluation.get('evaluation'))[:100]}...")
+                else:
+                    print(f"❌ Evaluation not ready: {evaluation.get('status')} {evaluation.get('error') or ''}")
                 
                 print(f"✅ WebSocket test completed. Received {len(self.messages_received)} messages")
                 return True
@@ -157,6 +163,19 @@ class WebSocketTester:
             print(f"❌ WebSocket connection failed: {str(e)}")
             return False
     
+    async def wait_for_evaluation(self, timeout=60.0, interval=2.0):
+        """Poll the evaluation job until it is ready or failed"""
+        deadline = asyncio.get_running_loop().time() + timeout
+        data = {}
+        while asyncio.get_running_loop().time() < deadline:
+            response = requests.get(f"{self.base_url}/api/interview/{self.interview_id}/evaluation")
+            if response.status_code == 200:
+                data = response.json()
+                if data.get('status') in ('ready', 'failed'):
+                    return data
+            await asyncio.sleep(interval)
+        return data
+    
     async def verify_interview_data(self):
         """Verify interview data was saved correctly"""
         response = requests.get(f"{self.base_url}/api/interview/{self.interview_id}")